@@ -0,0 +1,75 @@
+"""Mede a memória de 100 mil notícias como dicts e como Article, com e sem tradução.
+
+Os textos (títulos, URLs...) são criados antes da medição e compartilhados entre as
+representações, de modo que a diferença medida é só a dos contêineres. Uso:
+
+    python benchmarks/article_memory.py --count 100000
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from models import Article, TranslatedArticle  # noqa: E402
+
+def build_fields(count: int) -> list:
+    return [
+        (f"Título da notícia {i}", f"https://example.com/news/{i}", "tecnologia", "2024-05-01T10:00:00Z", i, i % 7)
+        for i in range(count)
+    ]
+
+def as_dicts(fields: list) -> list:
+    # Formato usado antes de Article: um dict por notícia
+    return [
+        {"news_id": news_id, "title": title, "url": url, "topic": topic, "published_at": published_at, "vote_count": votes}
+        for title, url, topic, published_at, news_id, votes in fields
+    ]
+
+def as_articles(fields: list) -> list:
+    return [
+        Article(title, url, topic, published_at, news_id, votes)
+        for title, url, topic, published_at, news_id, votes in fields
+    ]
+
+def translate_dicts(news_list: list, titles: list) -> list:
+    # Cópia completa por notícia, como o translate_news fazia
+    return [{**news, "title": title} for news, title in zip(news_list, titles)]
+
+def translate_articles(news_list: list, titles: list) -> list:
+    return [TranslatedArticle(news, title) for news, title in zip(news_list, titles)]
+
+def measure(build, *args):
+    """Retorna (resultado, bytes alocados) de build(*args)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(*args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="número de notícias")
+    args = parser.parse_args()
+    fields = build_fields(args.count)
+    translated_titles = [f"News title {i}" for i in range(args.count)]
+
+    dicts, dict_bytes = measure(as_dicts, fields)
+    articles, article_bytes = measure(as_articles, fields)
+    _, dict_translation_bytes = measure(translate_dicts, dicts, translated_titles)
+    _, article_translation_bytes = measure(translate_articles, articles, translated_titles)
+
+    def report(label, value, baseline):
+        per_item = value / args.count
+        print(f"{label:<28} {value / 2**20:8.1f} MB  {per_item:6.0f} B/notícia  ({value / baseline:.0%} do dict)")
+
+    print(f"{args.count} notícias (só contêineres; textos compartilhados)")
+    report("dict", dict_bytes, dict_bytes)
+    report("Article", article_bytes, dict_bytes)
+    report("tradução (cópia do dict)", dict_translation_bytes, dict_translation_bytes)
+    report("tradução (TranslatedArticle)", article_translation_bytes, dict_translation_bytes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Substitutos offline do Google Translate e dos objetos do Discord usados nos benchmarks."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+class FakeTranslator:
+    """Imita o GoogleTranslator: mesma interface, latência fixa por chamada e nenhuma rede.
+
+    A chamada é bloqueante (time.sleep), como a do backend real, que roda em uma thread.
+    """
+
+    def __init__(self, target: str, latency: float = 0.2):
+        self.target = target
+        self.latency = latency
+        self.calls = 0
+
+    def translate(self, text: str) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        return "\n".join(f"[{self.target}] {line}" for line in text.split("\n"))
+
+    def translate_batch(self, batch: list) -> list:
+        return [self.translate(text) for text in batch]
+
+class FakeUser:
+    """Usuário do Discord cujo envio de mensagem leva `latency` segundos."""
+
+    def __init__(self, user_id: int, latency: float = 0.05):
+        self.id = user_id
+        self.name = f"usuario{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+        self.latency = latency
+        self.sent = 0
+
+    async def send(self, content: str, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+def fake_bot(bot_user_id: int = 0, message_latency: float = 0.05) -> SimpleNamespace:
+    """Bot mínimo para NewsCog: só `user` e `get_user`, sem conexão com o gateway."""
+    users = {}
+
+    def get_user(user_id: int) -> FakeUser:
+        if user_id not in users:
+            users[user_id] = FakeUser(user_id, message_latency)
+        return users[user_id]
+
+    return SimpleNamespace(user=SimpleNamespace(id=bot_user_id), get_user=get_user)
+
+def reaction_payload(message_id: int, user: FakeUser, emoji: str = "👍") -> SimpleNamespace:
+    """Equivalente a discord.RawReactionActionEvent com os campos lidos por on_raw_reaction_add."""
+    return SimpleNamespace(message_id=message_id, user_id=user.id, member=user, emoji=emoji, guild_id=None)
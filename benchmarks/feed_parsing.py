@@ -0,0 +1,97 @@
+"""Compara o parse incremental de feeds com o parse completo do feedparser.
+
+Cada modo roda em um subprocesso próprio, para medir o pico de memória (RSS) sem
+interferência do outro. Uso:
+
+    python benchmarks/feed_parsing.py --items 5000 --limit 2 --runs 5
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from feed_parser import EntrySelector, FeedStreamParser, parse_with_feedparser  # noqa: E402
+
+CHUNK_SIZE = 65536
+
+def build_feed(items: int) -> bytes:
+    """Gera um feed RSS 2.0 sintético com `items` entradas, da mais nova para a mais antiga."""
+    entries = "".join(
+        f"<item><title>Notícia sintética número {i} sobre tecnologia &amp; games</title>"
+        f"<link>https://example.com/news/{i}?utm_source=rss</link><guid>news-{i}</guid>"
+        f"<pubDate>Wed, 01 May 2024 {23 - i % 24:02d}:{59 - i % 60:02d}:00 GMT</pubDate>"
+        f"<description>{'Texto da notícia. ' * 40}</description></item>"
+        for i in range(items)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Bench</title>{entries}</channel></rss>'.encode()
+
+def parse_stream(body: bytes, limit: int) -> list:
+    selector = EntrySelector({}, limit)
+    parser = FeedStreamParser()
+    for start in range(0, len(body), CHUNK_SIZE):
+        if any(selector.offer(entry) for entry in parser.feed(body[start:start + CHUNK_SIZE])):
+            return selector.entries
+    for entry in parser.close():
+        if selector.offer(entry):
+            break
+    return selector.entries
+
+def parse_feedparser(body: bytes, limit: int) -> list:
+    selector = EntrySelector({}, limit)
+    for entry in parse_with_feedparser(body):
+        if selector.offer(entry):
+            break
+    return selector.entries
+
+MODES = {"stream": parse_stream, "feedparser": parse_feedparser}
+
+def run_mode(mode: str, items: int, limit: int, runs: int) -> dict:
+    """Executa um modo no processo atual e retorna tempos e pico de RSS."""
+    body = build_feed(items)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        entries = MODES[mode](body, limit)
+        timings.append(time.perf_counter() - started_at)
+    assert len(entries) == min(limit, items)
+    return {
+        "mode": mode,
+        "feed_kb": len(body) // 1024,
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "parse_rss_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb) / 1024, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000, help="entradas no feed sintético")
+    parser.add_argument("--limit", type=int, default=2, help="entradas novas desejadas")
+    parser.add_argument("--runs", type=int, default=5, help="repetições por modo")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.items, args.limit, args.runs)))
+        return
+    print(f"Feed com {args.items} entradas, limite {args.limit}, {args.runs} execuções por modo")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--items", str(args.items),
+             "--limit", str(args.limit), "--runs", str(args.runs)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output)
+        print(
+            f"{mode:>10}: mediana {result['median_ms']} ms, máximo {result['max_ms']} ms, "
+            f"RSS do parse {result['parse_rss_mb']} MB (pico {result['peak_rss_mb']} MB, feed {result['feed_kb']} KB)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Simula carga sobre o bot, sem rede, e relata vazão e latência p50/p99 por cenário.
+
+Os feeds RSS e a News API vêm do servidor local (stub_server.py), o Google Translate e
+o Discord são substituídos pelos objetos de fakes.py e o banco é uma cópia de um
+news.db sintético (synthetic_db.py, gerado uma vez e reaproveitado). Cenários:
+
+    fetch_news     NewsService.fetch_news (News API + feeds RSS)
+    save_news      NewsService.save_news (deduplicação + gravação em lote)
+    top_voted      Database.get_top_voted_news
+    reactions      NewsCog.on_raw_reaction_add
+    daily_summary  NewsBot.send_daily_summary (latência por mensagem enviada)
+
+Para comparar commits, grave o resultado de um e compare o do outro com ele:
+
+    python benchmarks/load.py --output base.json
+    git checkout <outro-commit>
+    python benchmarks/load.py --compare base.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import synthetic_db  # noqa: E402
+from fakes import FakeTranslator, fake_bot, reaction_payload  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+SCENARIOS = ["fetch_news", "save_news", "top_voted", "reactions", "daily_summary"]
+LANGUAGES = ["pt", "en", "es", "fr"]
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarize(latencies: list, elapsed: float) -> dict:
+    return {
+        "ops": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3) if latencies else 0.0,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else 0.0
+    }
+
+async def drive(operation, total: int, concurrency: int) -> dict:
+    """Executa operation(i) para i em range(total) com `concurrency` chamadas simultâneas."""
+    latencies = []
+    indexes = iter(range(total))
+
+    async def worker():
+        for i in indexes:
+            started_at = time.perf_counter()
+            await operation(i)
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started_at)
+
+def prepare_workdir(args, stub_url: str) -> str:
+    """Cria o diretório da execução com a cópia do banco e o feeds.json, e aponta o bot para eles."""
+    base_db = args.db or os.path.join(
+        tempfile.gettempdir(), f"newsbot_bench_{args.users}_{args.articles}_{args.votes}.db"
+    )
+    if not os.path.exists(base_db):
+        print(f"Gerando banco sintético em {base_db}...", flush=True)
+        synthetic_db.generate(base_db, args.users, args.articles, args.votes)
+    workdir = tempfile.mkdtemp(prefix="newsbot_bench_")
+    shutil.copy(base_db, os.path.join(workdir, "news.db"))
+    feeds = [
+        {"url": f"{stub_url}/rss/{topic}/{n}", "topic": topic, "priority": n}
+        for topic in synthetic_db.TOPICS
+        for n in range(args.feeds_per_topic)
+    ]
+    with open(os.path.join(workdir, "feeds.json"), "w", encoding="utf-8") as f:
+        json.dump(feeds, f)
+    # config.py lê o ambiente ao ser importado: precisa vir antes dos módulos do bot
+    os.environ.update({
+        "DATABASE_FILE": os.path.join(workdir, "news.db"),
+        "FEEDS_FILE": os.path.join(workdir, "feeds.json"),
+        "LOG_FILE": os.path.join(workdir, "bot.log"),
+        "NEWSAPI_URL": f"{stub_url}/v2/everything",
+        "NEWS_API_KEY": "benchmark",
+        "NEWSAPI_QUOTA": "1000000000",
+        "METRICS_PORT": "0",
+        "SUMMARY_CHANNEL_ID": "0",
+        "SUMMARY_DM_RATE": str(args.dm_rate),
+        # Sem cache de buscas: cada chamada vai ao servidor (chamadas simultâneas ainda são coalescidas)
+        "FETCH_CACHE_TTL_SECONDS": "0",
+        "FETCH_CACHE_STALE_SECONDS": "0"
+    })
+    return workdir
+
+async def run(args) -> dict:
+    async with StubServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, items=args.items) as server:
+        workdir = prepare_workdir(args, server.url)
+        import config
+        from commands import NewsCog
+        from main import bot
+        from message_index import MessageIndex
+        from models import Article
+
+        db, news_service = bot.db, bot.news_service
+        news_service.translators = {lang: FakeTranslator(lang, args.translate_ms / 1000) for lang in LANGUAGES}
+        await news_service.feed_registry.load(config.FEEDS_FILE)
+        rng = random.Random(7)
+        results = {}
+        try:
+            if "fetch_news" in args.scenarios:
+                topics = synthetic_db.TOPICS
+                results["fetch_news"] = await drive(
+                    lambda i: news_service.fetch_news(topics[i % len(topics)], limit=5),
+                    args.requests, args.concurrency
+                )
+            if "save_news" in args.scenarios:
+                words = synthetic_db.vocabulary()
+                batches = [
+                    [
+                        Article(" ".join(rng.choices(words, k=8)).capitalize(), f"https://bench.example/{i}/{j}", rng.choice(synthetic_db.TOPICS))
+                        for j in range(args.batch)
+                    ]
+                    for i in range(args.requests)
+                ]
+                results["save_news"] = await drive(
+                    lambda i: news_service.save_news(batches[i]), args.requests, args.concurrency
+                )
+            if "top_voted" in args.scenarios:
+                topic_sets = [rng.sample(synthetic_db.TOPICS, rng.randint(1, 3)) for _ in range(args.requests)]
+                results["top_voted"] = await drive(
+                    lambda i: db.get_top_voted_news(topic_sets[i], limit=3), args.requests, args.concurrency
+                )
+            if "reactions" in args.scenarios:
+                discord_bot = fake_bot(message_latency=args.send_ms / 1000)
+                cog = NewsCog(discord_bot, db, news_service, MessageIndex(config.MESSAGE_INDEX_SIZE, config.MESSAGE_INDEX_BLOOM_CAPACITY))
+                await cog.cog_load()
+                message_ids = synthetic_db.message_ids(args.articles)
+                payloads = [
+                    reaction_payload(rng.choice(message_ids), discord_bot.get_user(rng.randint(1, args.users)), rng.choice("👍⭐"))
+                    for _ in range(args.reactions)
+                ]
+                results["reactions"] = await drive(
+                    lambda i: cog.on_raw_reaction_add(payloads[i]), args.reactions, args.concurrency
+                )
+                await db.flush_votes()
+            if "daily_summary" in args.scenarios:
+                bot.get_user = fake_bot(message_latency=args.send_ms / 1000).get_user
+                await bot.send_daily_summary()
+                stats = bot.summary_stats
+                results["daily_summary"] = {
+                    "ops": stats.get("sent", 0),
+                    "seconds": stats.get("duration_s", 0.0),
+                    "throughput": stats.get("throughput_per_s", 0.0),
+                    "p50_ms": round(stats.get("latency_p50_s", 0.0) * 1000, 3),
+                    "p99_ms": round(stats.get("latency_p99_s", 0.0) * 1000, 3)
+                }
+        finally:
+            await news_service.close()
+            await db.close()
+            shutil.rmtree(workdir, ignore_errors=True)
+        return results
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Imprime a variação em relação à linha de base e retorna os cenários que regrediram."""
+    regressions = []
+    print(f"\nComparação com {baseline.get('commit', '?')} (limite {threshold:.0%}):")
+    for scenario, current in results.items():
+        previous = baseline.get("results", {}).get(scenario)
+        if not previous:
+            continue
+        throughput_change = (current["throughput"] - previous["throughput"]) / previous["throughput"] if previous["throughput"] else 0.0
+        p99_change = (current["p99_ms"] - previous["p99_ms"]) / previous["p99_ms"] if previous["p99_ms"] else 0.0
+        regressed = throughput_change < -threshold or p99_change > threshold
+        if regressed:
+            regressions.append(scenario)
+        print(
+            f"{scenario:>14}: vazão {throughput_change:+7.1%}  p99 {p99_change:+7.1%}"
+            f"{'  <- REGRESSÃO' if regressed else ''}"
+        )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--db", help="news.db sintético base (padrão: gerado em /tmp conforme os tamanhos)")
+    parser.add_argument("--users", type=int, default=1000, help="usuários no banco sintético")
+    parser.add_argument("--articles", type=int, default=50000, help="notícias no banco sintético")
+    parser.add_argument("--votes", type=int, default=200000, help="votos no banco sintético")
+    parser.add_argument("--requests", type=int, default=200, help="operações por cenário")
+    parser.add_argument("--reactions", type=int, default=5000, help="reações no cenário reactions")
+    parser.add_argument("--concurrency", type=int, default=20, help="operações simultâneas")
+    parser.add_argument("--batch", type=int, default=20, help="notícias por chamada de save_news")
+    parser.add_argument("--feeds-per-topic", type=int, default=3)
+    parser.add_argument("--items", type=int, default=20, help="entradas por feed no servidor local")
+    parser.add_argument("--latency-ms", type=float, default=50, help="latência do servidor local")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="latência extra aleatória do servidor local")
+    parser.add_argument("--translate-ms", type=float, default=100, help="latência de cada chamada ao tradutor falso")
+    parser.add_argument("--send-ms", type=float, default=20, help="latência de cada mensagem enviada ao Discord falso")
+    parser.add_argument("--dm-rate", type=float, default=1000, help="SUMMARY_DM_RATE durante o teste")
+    parser.add_argument("--output", help="grava o resultado em JSON (linha de base para --compare)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10, help="piora relativa que conta como regressão")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"Commit {current_commit()}, concorrência {args.concurrency}")
+    print(f"{'cenário':>14}  {'ops':>6}  {'ops/s':>9}  {'p50 (ms)':>9}  {'p99 (ms)':>9}")
+    for scenario, result in results.items():
+        print(f"{scenario:>14}  {result['ops']:>6}  {result['throughput']:>9.1f}  {result['p50_ms']:>9.2f}  {result['p99_ms']:>9.2f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"commit": current_commit(), "args": vars(args), "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Mede o custo por chamada de logging.info com escrita direta em arquivo e com a fila.
+
+Com --stall-ms, uma a cada --stall-every escritas no arquivo demora esse tempo, simulando
+um disco lento. Cada modo roda em um subprocesso próprio (o logger raiz é global). Uso:
+
+    python benchmarks/logging_overhead.py --calls 20000 --stall-ms 50 --stall-every 1000
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from logging_setup import setup_logging  # noqa: E402
+
+MODES = ["arquivo", "fila", "fila+amostragem"]
+
+def stalling(emit, stall_seconds: float, every: int):
+    """Envolve o emit de um handler para que uma a cada `every` escritas demore `stall_seconds`."""
+    count = 0
+
+    def wrapper(record):
+        nonlocal count
+        count += 1
+        if stall_seconds and count % every == 0:
+            time.sleep(stall_seconds)
+        emit(record)
+
+    return wrapper
+
+def run_mode(mode: str, calls: int, stall_seconds: float, stall_every: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.log")
+    if mode == "arquivo":
+        # Configuração anterior: basicConfig com FileHandler no logger raiz
+        logging.basicConfig(filename=path, level=logging.INFO, format="%(asctime)s:%(levelname)s:%(message)s")
+        handler = logging.getLogger().handlers[0]
+        listener = None
+    else:
+        listener = setup_logging(
+            path,
+            queue_size=calls + 1,
+            sampled_events={"reaction"} if mode == "fila+amostragem" else set(),
+            sample_every=10
+        )
+        handler = listener.handlers[0]
+    handler.emit = stalling(handler.emit, stall_seconds, stall_every)
+    extra = {"event": "reaction"}
+    timings = []
+    for i in range(calls):
+        started_at = time.perf_counter()
+        logging.info(f"Reação upvote adicionada por {i} em 3 notícias", extra=extra)
+        timings.append(time.perf_counter() - started_at)
+    drain_started_at = time.perf_counter()
+    if listener is not None:
+        listener.stop()
+    timings.sort()
+    return {
+        "mode": mode,
+        "mean_us": round(statistics.mean(timings) * 1e6, 2),
+        "p50_us": round(timings[len(timings) // 2] * 1e6, 2),
+        "p99_us": round(timings[int(len(timings) * 0.99)] * 1e6, 2),
+        "max_ms": round(timings[-1] * 1000, 2),
+        "drain_ms": round((time.perf_counter() - drain_started_at) * 1000, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000, help="chamadas de log por modo")
+    parser.add_argument("--stall-ms", type=float, default=0, help="duração de cada travada simulada do disco")
+    parser.add_argument("--stall-every", type=int, default=1000, help="escritas entre travadas")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.calls, args.stall_ms / 1000, args.stall_every)))
+        return
+    print(f"{args.calls} chamadas por modo, travada de {args.stall_ms} ms a cada {args.stall_every} escritas")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--calls", str(args.calls),
+             "--stall-ms", str(args.stall_ms), "--stall-every", str(args.stall_every)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output)
+        print(
+            f"{mode:>16}: média {result['mean_us']} µs, p50 {result['p50_us']} µs, p99 {result['p99_us']} µs, "
+            f"máximo {result['max_ms']} ms (esvaziar a fila: {result['drain_ms']} ms)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Mede a latência de Database.search_news (FTS5) sobre um banco sintético.
+
+O banco é gerado uma vez (padrão: 1 milhão de notícias) e reaproveitado nas execuções
+seguintes. Uso:
+
+    python benchmarks/search_news.py --rows 1000000 --db /tmp/search_bench.db
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database import Database  # noqa: E402
+
+TOPICS = ["tecnologia", "games", "ciberseguranca", "ciencia", "economia"]
+VOCABULARY_SIZE = 20000
+WORDS_PER_TITLE = 8
+
+def vocabulary() -> list:
+    rng = random.Random(1)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+def populate(db: Database, rows: int, words: list):
+    """Insere `rows` notícias com títulos de frequência de palavras em lei de Zipf."""
+    rng = random.Random(2)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    batch_size = 50000
+    with db.get_connection() as conn:
+        for start in range(0, rows, batch_size):
+            count = min(batch_size, rows - start)
+            titles = [" ".join(rng.choices(words, weights, k=WORDS_PER_TITLE)) for _ in range(count)]
+            conn.executemany(
+                "INSERT INTO news (title, url, topic, published_at) VALUES (?, ?, ?, ?)",
+                [
+                    (title, f"https://example.com/{start + i}", TOPICS[(start + i) % len(TOPICS)], "2024-05-01T10:00:00Z")
+                    for i, title in enumerate(titles)
+                ]
+            )
+            conn.commit()
+            print(f"  {start + count} notícias inseridas", flush=True)
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="notícias no banco sintético")
+    parser.add_argument("--db", default="search_bench.db", help="arquivo do banco (reaproveitado se já existir)")
+    parser.add_argument("--runs", type=int, default=50, help="repetições por consulta")
+    parser.add_argument("--page-size", type=int, default=5, help="resultados por página")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # O log por consulta distorceria a medição
+
+    words = vocabulary()
+    db = Database(args.db)
+    with db.get_connection() as conn:
+        existing = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+    if existing < args.rows:
+        print(f"Gerando {args.rows - existing} notícias em {args.db}...")
+        started_at = time.perf_counter()
+        populate(db, args.rows - existing, words)
+        print(f"Geração concluída em {time.perf_counter() - started_at:.1f}s")
+
+    queries = [
+        ("palavra muito frequente", words[0], None, 0),
+        ("palavra frequente", words[50], None, 0),
+        ("palavra rara", words[15000], None, 0),
+        ("prefixo", words[200][:3], None, 0),
+        ("duas palavras", f"{words[10]} {words[30]}", None, 0),
+        ("com tópico", words[50], "games", 0),
+        ("página 10", words[50], None, 9 * args.page_size)
+    ]
+    print(f"{existing if existing >= args.rows else args.rows} notícias, {args.runs} execuções por consulta")
+    for label, query, topic, offset in queries:
+        timings = []
+        for _ in range(args.runs):
+            started_at = time.perf_counter()
+            results = db.search_news(query, limit=args.page_size + 1, offset=offset, topic=topic)
+            timings.append(time.perf_counter() - started_at)
+        print(
+            f"{label:<24} {query!r:<24} p50 {statistics.median(timings) * 1000:8.2f} ms  "
+            f"p99 {percentile(timings, 0.99) * 1000:8.2f} ms  ({len(results)} resultados)"
+        )
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Servidor HTTP local que imita os feeds RSS e a News API, com latência configurável.
+
+Cada resposta traz notícias novas (títulos e URLs inéditos), como fontes movimentadas.
+Rotas:
+
+    GET /rss/<tópico>/<n>   feed RSS 2.0 com --items entradas
+    GET /v2/everything      JSON no formato da News API (respeita pageSize)
+
+Uso isolado (para apontar o bot para ele via NEWSAPI_URL e feeds.json):
+
+    python benchmarks/stub_server.py --port 8765 --latency-ms 80 --jitter-ms 40
+"""
+import argparse
+import asyncio
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from aiohttp import web
+
+WORDS = (
+    "chip rede nuvem ataque jogo console patch senha dados modelo servidor falha lançamento "
+    "bateria satélite foguete mercado startup robô sensor código privacidade vazamento "
+    "atualização consórcio energia clima vacina telescópio protocolo navegador"
+).split()
+
+class StubServer:
+    """Servidor de notícias sintéticas; use com `async with StubServer(...) as server`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05, jitter: float = 0.0, items: int = 20, seed: int = 1):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.items = items
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._ids = itertools.count()
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/rss/{topic}/{feed}", self.handle_rss)
+        app.router.add_get("/v2/everything", self.handle_newsapi)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Com port=0 o sistema escolhe uma porta livre
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+    async def _delay(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency + self._rng.uniform(0, self.jitter))
+
+    def _articles(self, topic: str, count: int) -> list:
+        """Gera `count` notícias inéditas, da mais nova para a mais antiga."""
+        now = datetime.now(timezone.utc)
+        articles = []
+        for age in range(count):
+            news_id = next(self._ids)
+            title = " ".join(self._rng.choices(WORDS, k=8)) + f" {news_id}"
+            articles.append((title.capitalize(), f"https://stub.example/{topic}/{news_id}", now - timedelta(minutes=age)))
+        return articles
+
+    async def handle_rss(self, request: web.Request) -> web.Response:
+        await self._delay()
+        topic = request.match_info["topic"]
+        items = "".join(
+            f"<item><title>{title}</title><link>{url}</link><guid>{url}</guid>"
+            f"<pubDate>{format_datetime(published)}</pubDate></item>"
+            for title, url, published in self._articles(topic, self.items)
+        )
+        body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>{topic}</title>{items}</channel></rss>'
+        return web.Response(text=body, content_type="application/rss+xml")
+
+    async def handle_newsapi(self, request: web.Request) -> web.Response:
+        await self._delay()
+        topic = request.query.get("q", "geral")
+        count = int(request.query.get("pageSize", self.items))
+        articles = [
+            {"title": title, "url": url, "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ")}
+            for title, url, published in self._articles(topic, count)
+        ]
+        return web.json_response({"status": "ok", "totalResults": len(articles), "articles": articles})
+
+async def serve(args):
+    async with StubServer(args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000, args.items) as server:
+        print(f"Servidor de notícias sintéticas em {server.url} (Ctrl+C para encerrar)")
+        await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50, help="latência fixa por resposta")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="latência extra aleatória (0 a este valor)")
+    parser.add_argument("--items", type=int, default=20, help="entradas por feed")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Gera um news.db sintético com N usuários, M notícias e K votos.
+
+Também cria assinaturas (1 a 3 tópicos por usuário), mensagens de notícias (5 notícias
+por mensagem, para as reações) e as assinaturas de duplicata das notícias. Uso:
+
+    python benchmarks/synthetic_db.py --db /tmp/bench.db --users 1000 --articles 50000 --votes 200000
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database import Database  # noqa: E402
+from dedup import canonical_url, minhash  # noqa: E402
+
+TOPICS = ["tecnologia", "games", "ciberseguranca", "ciencia", "economia"]
+NEWS_PER_MESSAGE = 5
+MESSAGE_ID_BASE = 10**17  # Faixa de snowflakes do Discord
+
+def vocabulary(size: int = 5000) -> list:
+    rng = random.Random(1)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+def message_ids(articles: int) -> list:
+    """IDs das mensagens criadas por generate() para `articles` notícias."""
+    return [MESSAGE_ID_BASE + i for i in range(articles // NEWS_PER_MESSAGE)]
+
+def generate(path: str, users: int, articles: int, votes: int, seed: int = 42):
+    """Cria (ou recria) o banco em `path` com o esquema atual e dados aleatórios reproduzíveis."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rng = random.Random(seed)
+    words = vocabulary()
+    db = Database(path)
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO users (user_id, username) VALUES (?, ?)",
+            [(user_id, f"usuario{user_id}") for user_id in range(1, users + 1)]
+        )
+        conn.executemany(
+            "INSERT INTO subscriptions (user_id, topic) VALUES (?, ?)",
+            [
+                (user_id, topic)
+                for user_id in range(1, users + 1)
+                for topic in rng.sample(TOPICS, rng.randint(1, 3))
+            ]
+        )
+        rows = []
+        for i in range(articles):
+            title = " ".join(rng.choices(words, k=8)).capitalize()
+            url = f"https://example.com/{TOPICS[i % len(TOPICS)]}/{i}?utm_source=rss"
+            published_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1714557600 + i * 60))
+            rows.append((title, url, TOPICS[i % len(TOPICS)], published_at, canonical_url(url), minhash(title)))
+        conn.executemany(
+            "INSERT INTO news (title, url, topic, published_at, canonical_url, minhash) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.executemany(
+            "INSERT INTO message_news (message_id, news_id) VALUES (?, ?)",
+            [
+                (message_id, (message_id - MESSAGE_ID_BASE) * NEWS_PER_MESSAGE + offset + 1)
+                for message_id in message_ids(articles)
+                for offset in range(NEWS_PER_MESSAGE)
+            ]
+        )
+        # Votos concentrados nas notícias recentes, como no uso real
+        pairs = set()
+        while len(pairs) < min(votes, users * articles):
+            news_id = articles - int(articles * rng.random() ** 4)
+            pairs.add((news_id, rng.randint(1, users)))
+        conn.executemany(
+            "INSERT INTO votes (news_id, user_id, vote_type) VALUES (?, ?, ?)",
+            [(news_id, user_id, rng.choice(("upvote", "star"))) for news_id, user_id in pairs]
+        )
+        conn.commit()
+    db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="bench.db", help="arquivo a criar (sobrescrito)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--votes", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    started_at = time.perf_counter()
+    generate(args.db, args.users, args.articles, args.votes, args.seed)
+    print(
+        f"{args.db}: {args.users} usuários, {args.articles} notícias, {args.votes} votos "
+        f"em {time.perf_counter() - started_at:.1f}s"
+    )
+
+if __name__ == "__main__":
+    main()
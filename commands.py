@@ -2,100 +2,151 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ui import Button, Select
-from database import Database
+from database import AsyncDatabase
+import metrics
+from message_index import MessageIndex
 from news import NewsService
 import logging
 import sqlite3
 
-# Configurar logging
-logging.basicConfig(
-    filename="bot.log",
-    level=logging.INFO,
-    format="%(asctime)s:%(levelname)s:%(message)s"
-)
+# Emojis de reação que contam como voto
+REACTION_VOTES = {"👍": "upvote", "⭐": "star"}
+
+def detached(view: discord.ui.View) -> discord.ui.View:
+    """Prepara uma view persistente para ser anexada a uma mensagem sem ficar guardada nela.
+
+    O discord.py não guarda views já encerradas; os cliques chegam à instância registrada
+    com bot.add_view pelos custom_id fixos, sem um objeto vivo por mensagem.
+    """
+    view.stop()
+    return view
+
+async def resolve_news_ids(db: AsyncDatabase, message_index: MessageIndex, message_id: int) -> list:
+    """Retorna os news_id de uma mensagem de notícias, pelo índice em memória ou pelo banco."""
+    news_ids = message_index.get(message_id)
+    if news_ids is None:
+        news_ids = await db.get_news_ids_by_message(message_id)
+        # Também guarda listas vazias (falsos positivos do filtro de Bloom)
+        message_index.add(message_id, news_ids)
+    return news_ids
 
 class NewsCog(commands.Cog):
-    def __init__(self, bot, db: Database, news_service: NewsService):
+    def __init__(self, bot, db: AsyncDatabase, news_service: NewsService, message_index: MessageIndex, lookup_dm_misses: bool = False):
         self.bot = bot
         self.db = db
         self.news_service = news_service
-        self.topics = ["tecnologia", "games", "ciberseguranca"]
+        self.message_index = message_index
+        # Em um cluster, reações em DMs chegam ao shard 0, e a mensagem pode ter sido
+        # enviada por outro processo (fora do filtro de Bloom deste)
+        self.lookup_dm_misses = lookup_dm_misses
+
+    @property
+    def topics(self) -> list:
+        return self.news_service.feed_registry.topics()
+
+    async def cog_load(self):
+        """Pré-carrega o índice de mensagens de notícias a partir do banco."""
+        count = 0
+        async for message_id, news_ids in self.db.stream("iter_news_messages"):
+            self.message_index.add(message_id, news_ids)
+            count += 1
+        logging.info(f"Índice de mensagens carregado com {count} mensagens de notícias.")
 
     @app_commands.command(name="news", description="Acessa o menu de notícias")
     async def news(self, interaction: discord.Interaction):
-        self.db.add_user(interaction.user.id, interaction.user.name)
-        view = NewsView(self.db, self.news_service, self.topics, interaction.guild)
+        await self.db.add_user(interaction.user.id, interaction.user.name)
         await interaction.response.send_message(
             "Bem-vindo ao News Bot! Escolha uma ação:",
-            view=view,
+            view=detached(NewsView(self.db, self.news_service, self.message_index)),
             ephemeral=True
         )
+        metrics.observe_ack(interaction, "news")
         logging.info(f"Comando /news executado por {interaction.user}")
 
+    @app_commands.command(name="search", description="Busca notícias já armazenadas por palavra-chave")
+    @app_commands.describe(termo="Palavras a buscar no título", topico="Restringe a busca a um tópico")
+    async def search(self, interaction: discord.Interaction, termo: str, topico: str = None):
+        page_size = self.bot.config.SEARCH_PAGE_SIZE
+        # Pede um item a mais para saber se existe próxima página
+        results = await self.db.search_news(termo, limit=page_size + 1, offset=0, topic=topico)
+        if not results:
+            await interaction.response.send_message(f"Nenhuma notícia encontrada para \"{termo}\".", ephemeral=True)
+            metrics.observe_ack(interaction, "search")
+            return
+        view = SearchView(self.db, termo, topico, page_size)
+        await interaction.response.send_message(view.render(results), view=view, ephemeral=True)
+        metrics.observe_ack(interaction, "search")
+        logging.info(f"Comando /search executado por {interaction.user}: {termo!r} (tópico {topico})")
+
+    @search.autocomplete("topico")
+    async def search_topic_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=topic, value=topic)
+            for topic in self.topics
+            if current.lower() in topic.lower()
+        ][:25]
+
     @commands.Cog.listener()
-    async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User):
-        if user.bot:
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        # Evento bruto: também dispara para mensagens fora do cache do discord.py
+        vote_type = REACTION_VOTES.get(str(payload.emoji))
+        if vote_type is None or payload.user_id == self.bot.user.id:
+            return
+        message_id = payload.message_id
+        # Reações em mensagens que não são de notícias terminam aqui, sem tocar no SQLite
+        if not self.message_index.might_contain(message_id) and not (self.lookup_dm_misses and payload.guild_id is None):
+            return
+        user = payload.member or self.bot.get_user(payload.user_id)
+        if user is not None and user.bot:
             return
-        message_id = reaction.message.id
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT news_id FROM news WHERE message_id = ?",
-                    (message_id,)
-                )
-                result = cursor.fetchone()
-                if not result:
-                    return
-                news_id = result["news_id"]
-                vote_type = None
-                if str(reaction.emoji) == "👍":
-                    vote_type = "upvote"
-                elif str(reaction.emoji) == "⭐":
-                    vote_type = "star"
-                if vote_type:
-                    self.db.add_user(user.id, user.name)
-                    self.db.add_vote(news_id, user.id, vote_type)
-                    logging.info(f"Reação {vote_type} adicionada por {user} na notícia {news_id}")
+            news_ids = await resolve_news_ids(self.db, self.message_index, message_id)
+            if not news_ids:
+                return
+            await self.db.add_votes(news_ids, payload.user_id, vote_type, username=user.name if user else None)
+            logging.info(f"Reação {vote_type} adicionada por {payload.user_id} em {len(news_ids)} notícias", extra={"event": "reaction"})
         except sqlite3.Error as e:
             logging.error(f"Erro ao processar reação para mensagem {message_id}: {e}")
 
 class NewsView(discord.ui.View):
-    def __init__(self, db: Database, news_service: NewsService, topics: list, guild: discord.Guild):
+    """Menu do /news. Persistente: uma única instância, registrada no setup, atende a todas as mensagens."""
+
+    def __init__(self, db: AsyncDatabase, news_service: NewsService, message_index: MessageIndex):
         super().__init__(timeout=None)
         self.db = db
         self.news_service = news_service
-        self.topics = topics
-        self.guild = guild
+        self.message_index = message_index
 
-        button_subscribe = Button(label="Assinar Tópicos", style=discord.ButtonStyle.primary)
+        button_subscribe = Button(label="Assinar Tópicos", style=discord.ButtonStyle.primary, custom_id="news:subscribe")
         button_subscribe.callback = self.subscribe_button_callback
         self.add_item(button_subscribe)
 
-        button_view = Button(label="Ver Notícias", style=discord.ButtonStyle.secondary)
+        button_view = Button(label="Ver Notícias", style=discord.ButtonStyle.secondary, custom_id="news:view")
         button_view.callback = self.view_news_button_callback
         self.add_item(button_view)
 
-        button_summary = Button(label="Resumo Diário", style=discord.ButtonStyle.secondary)
+        button_summary = Button(label="Resumo Diário", style=discord.ButtonStyle.secondary, custom_id="news:summary")
         button_summary.callback = self.summary_button_callback
         self.add_item(button_summary)
 
     async def subscribe_button_callback(self, interaction: discord.Interaction):
-        view = SubscribeView(self.db, self.topics, interaction.user.id)
+        view = SubscribeView(self.db, self.news_service.feed_registry.topics(), interaction.user.id)
         await interaction.response.send_message(
             "Selecione um ou mais tópicos para assinar/desassinar:",
             view=view,
             ephemeral=True
         )
+        metrics.observe_ack(interaction, "NewsView.subscribe_button")
         logging.info(f"Botão 'Assinar Tópicos' clicado por {interaction.user}")
 
     async def view_news_button_callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        subscriptions = self.db.get_subscriptions(interaction.user.id)
+        metrics.observe_ack(interaction, "NewsView.view_news_button")
+        subscriptions = await self.db.get_subscriptions(interaction.user.id)
         if not subscriptions:
             await interaction.followup.send("Você não assinou nenhum tópico!", ephemeral=True)
             return
-        view = LanguageView(self.db, self.news_service, subscriptions, self.guild, interaction.user, is_summary=False)
+        view = LanguageView(self.db, self.news_service, self.message_index, subscriptions, interaction.guild, interaction.user, is_summary=False)
         await interaction.followup.send(
             "Escolha o idioma para as notícias:",
             view=view,
@@ -105,11 +156,12 @@ class NewsView(discord.ui.View):
 
     async def summary_button_callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        subscriptions = self.db.get_subscriptions(interaction.user.id)
+        metrics.observe_ack(interaction, "NewsView.summary_button")
+        subscriptions = await self.db.get_subscriptions(interaction.user.id)
         if not subscriptions:
             await interaction.followup.send("Você não assinou nenhum tópico!", ephemeral=True)
             return
-        view = LanguageView(self.db, self.news_service, subscriptions, self.guild, interaction.user, is_summary=True)
+        view = LanguageView(self.db, self.news_service, self.message_index, subscriptions, interaction.guild, interaction.user, is_summary=True)
         await interaction.followup.send(
             "Escolha o idioma para o resumo diário:",
             view=view,
@@ -118,10 +170,11 @@ class NewsView(discord.ui.View):
         logging.info(f"Botão 'Resumo Diário' clicado por {interaction.user}")
 
 class SubscribeView(discord.ui.View):
-    def __init__(self, db: Database, topics: list, user_id: int):
+    def __init__(self, db: AsyncDatabase, topics: list, user_id: int):
         super().__init__(timeout=60.0)
         self.db = db
         self.user_id = user_id
+        topics = topics[:25]  # Limite de opções de um menu do Discord
         select = Select(
             placeholder="Escolha um ou mais tópicos",
             options=[
@@ -136,16 +189,16 @@ class SubscribeView(discord.ui.View):
 
     async def select_callback(self, interaction: discord.Interaction):
         selected_topics = interaction.data["values"]
-        current_subscriptions = set(self.db.get_subscriptions(self.user_id))
+        current_subscriptions = set(await self.db.get_subscriptions(self.user_id))
         added = []
         removed = []
 
         for topic in selected_topics:
             if topic in current_subscriptions:
-                self.db.remove_subscription(self.user_id, topic)
+                await self.db.remove_subscription(self.user_id, topic)
                 removed.append(topic)
             else:
-                self.db.add_subscription(self.user_id, topic)
+                await self.db.add_subscription(self.user_id, topic)
                 added.append(topic)
 
         message = []
@@ -153,7 +206,7 @@ class SubscribeView(discord.ui.View):
             message.append(f"Assinados: {', '.join(added)}")
         if removed:
             message.append(f"Desassinados: {', '.join(removed)}")
-        updated_subscriptions = self.db.get_subscriptions(self.user_id)
+        updated_subscriptions = await self.db.get_subscriptions(self.user_id)
         if updated_subscriptions:
             message.append(f"Tópicos atuais: {', '.join(updated_subscriptions)}")
         else:
@@ -163,16 +216,18 @@ class SubscribeView(discord.ui.View):
             "\n".join(message),
             ephemeral=True
         )
+        metrics.observe_ack(interaction, "SubscribeView.select")
         logging.info(
             f"Usuário {interaction.user} atualizou assinaturas: "
             f"Adicionados={added}, Removidos={removed}"
         )
 
 class LanguageView(discord.ui.View):
-    def __init__(self, db: Database, news_service: NewsService, subscriptions: list, guild: discord.Guild, user: discord.User, is_summary: bool):
+    def __init__(self, db: AsyncDatabase, news_service: NewsService, message_index: MessageIndex, subscriptions: list, guild: discord.Guild, user: discord.User, is_summary: bool):
         super().__init__(timeout=60.0)
         self.db = db
         self.news_service = news_service
+        self.message_index = message_index
         self.subscriptions = subscriptions
         self.guild = guild
         self.user = user
@@ -191,19 +246,20 @@ class LanguageView(discord.ui.View):
 
     async def select_callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
+        metrics.observe_ack(interaction, "LanguageView.select")
         target_lang = interaction.data["values"][0]
 
         if self.is_summary:
-            top_news = self.db.get_top_voted_news(self.subscriptions, limit=3)
+            top_news = await self.db.get_top_voted_news(self.subscriptions, limit=3)
             if not top_news:
                 await interaction.followup.send("Nenhuma notícia votada encontrada para seus tópicos.", ephemeral=True)
                 return
-            translated_news = self.news_service.translate_news(top_news, target_lang)
-            response = "\n".join([f"- {news['title']} ({news['url']}) [{news['vote_count']} votos]" for news in translated_news])
+            translated_news = await self.news_service.translate_news(top_news, target_lang)
+            response = "\n".join([f"- {news.title} ({news.url}) [{news.vote_count} votos]" for news in translated_news])
             await interaction.followup.send(f"Resumo diário ({target_lang}):\n{response}", ephemeral=True)
             logging.info(f"Resumo diário exibido para {self.user} em {target_lang}, {len(top_news)} notícias")
         else:
-            view = DeliveryView(self.db, self.news_service, self.subscriptions, self.guild, self.user, target_lang)
+            view = DeliveryView(self.db, self.news_service, self.message_index, self.subscriptions, self.guild, self.user, target_lang)
             await interaction.followup.send(
                 "Escolha onde receber as notícias:",
                 view=view,
@@ -212,10 +268,11 @@ class LanguageView(discord.ui.View):
             logging.info(f"Idioma {target_lang} selecionado por {self.user} para notícias")
 
 class DeliveryView(discord.ui.View):
-    def __init__(self, db: Database, news_service: NewsService, subscriptions: list, guild: discord.Guild, user: discord.User, target_lang: str):
+    def __init__(self, db: AsyncDatabase, news_service: NewsService, message_index: MessageIndex, subscriptions: list, guild: discord.Guild, user: discord.User, target_lang: str):
         super().__init__(timeout=60.0)
         self.db = db
         self.news_service = news_service
+        self.message_index = message_index
         self.subscriptions = subscriptions
         self.guild = guild
         self.user = user
@@ -232,21 +289,21 @@ class DeliveryView(discord.ui.View):
 
     async def select_callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
+        metrics.observe_ack(interaction, "DeliveryView.select")
         destination = interaction.data["values"][0]
-        news_list = []
-        for topic in self.subscriptions:
-            news_list.extend(self.news_service.fetch_news(topic, limit=2))
+        # Notícias vêm do banco local, pré-carregado pela tarefa de ingestão
+        news_list = await self.news_service.get_news_for_topics(self.subscriptions, limit=2)
         if not news_list:
             await interaction.followup.send("Nenhuma notícia encontrada para seus tópicos.", ephemeral=True)
             return
 
         # Traduzir notícias
-        translated_news = self.news_service.translate_news(news_list, self.target_lang)
-        news_ids = self.news_service.save_news(news_list)  # Salvar notícias originais
-        response = "\n".join([f"- {news['title']} ({news['url']})" for news in translated_news])
+        translated_news = await self.news_service.translate_news(news_list, self.target_lang)
+        news_ids = [news.news_id for news in news_list]
+        response = "\n".join([f"- {news.title} ({news.url})" for news in translated_news])
 
         try:
-            view = VoteView(self.db, news_ids)
+            view = detached(VoteView(self.db, self.message_index))
             if destination == "dm":
                 message = await self.user.send(f"Notícias para seus tópicos ({self.target_lang}):\n{response}", view=view)
             else:
@@ -255,8 +312,8 @@ class DeliveryView(discord.ui.View):
             await message.add_reaction("👍")
             await message.add_reaction("⭐")
 
-            for news_id in news_ids:
-                self.db.update_news_message_id(news_id, message.id)
+            await self.db.add_message_news(message.id, news_ids)
+            self.message_index.add(message.id, news_ids)
 
             await interaction.followup.send("Notícias enviadas com sucesso!", ephemeral=True)
             logging.info(
@@ -270,26 +327,77 @@ class DeliveryView(discord.ui.View):
             )
             logging.error(f"Erro ao enviar notícias para {destination}: {e}")
 
+class SearchView(discord.ui.View):
+    def __init__(self, db: AsyncDatabase, query: str, topic: str, page_size: int):
+        super().__init__(timeout=120.0)
+        self.db = db
+        self.query = query
+        self.topic = topic
+        self.page_size = page_size
+        self.offset = 0
+        self.button_previous = Button(label="Anterior", style=discord.ButtonStyle.secondary)
+        self.button_previous.callback = self.previous_button_callback
+        self.add_item(self.button_previous)
+        self.button_next = Button(label="Próxima", style=discord.ButtonStyle.secondary)
+        self.button_next.callback = self.next_button_callback
+        self.add_item(self.button_next)
+
+    def render(self, results: list) -> str:
+        """Monta o texto da página atual e habilita os botões conforme houver mais páginas."""
+        self.button_previous.disabled = self.offset == 0
+        self.button_next.disabled = len(results) <= self.page_size
+        lines = [
+            f"{self.offset + index}. {news.title} ({news.url}) [{news.topic}]"
+            for index, news in enumerate(results[:self.page_size], start=1)
+        ]
+        page = self.offset // self.page_size + 1
+        return f"Resultados para \"{self.query}\" (página {page}):\n" + "\n".join(lines)
+
+    async def previous_button_callback(self, interaction: discord.Interaction):
+        await self.show_page(interaction, max(0, self.offset - self.page_size))
+
+    async def next_button_callback(self, interaction: discord.Interaction):
+        await self.show_page(interaction, self.offset + self.page_size)
+
+    async def show_page(self, interaction: discord.Interaction, offset: int):
+        results = await self.db.search_news(self.query, limit=self.page_size + 1, offset=offset, topic=self.topic)
+        if not results:
+            await interaction.response.send_message("Não há mais resultados.", ephemeral=True)
+            metrics.observe_ack(interaction, "SearchView.show_page")
+            return
+        self.offset = offset
+        await interaction.response.edit_message(content=self.render(results), view=self)
+        metrics.observe_ack(interaction, "SearchView.show_page")
+        logging.info(f"Página {offset // self.page_size + 1} da busca {self.query!r} exibida para {interaction.user}")
+
 class VoteView(discord.ui.View):
-    def __init__(self, db: Database, news_ids: list):
+    """Botão "Votar" das mensagens de notícias. Persistente: as notícias vêm de message_news pelo ID da mensagem."""
+
+    def __init__(self, db: AsyncDatabase, message_index: MessageIndex):
         super().__init__(timeout=None)
         self.db = db
-        self.news_ids = news_ids
-        button = Button(label="Votar", style=discord.ButtonStyle.primary)
+        self.message_index = message_index
+        button = Button(label="Votar", style=discord.ButtonStyle.primary, custom_id="vote:open")
         button.callback = self.vote_button_callback
         self.add_item(button)
 
     async def vote_button_callback(self, interaction: discord.Interaction):
-        view = VoteSelectView(self.db, self.news_ids, interaction.user.id)
+        news_ids = await resolve_news_ids(self.db, self.message_index, interaction.message.id)
+        if not news_ids:
+            await interaction.response.send_message("Não encontrei as notícias desta mensagem.", ephemeral=True)
+            metrics.observe_ack(interaction, "VoteView.vote_button")
+            return
+        view = VoteSelectView(self.db, news_ids, interaction.user.id)
         await interaction.response.send_message(
             "Escolha o tipo de voto para as notícias:",
             view=view,
             ephemeral=True
         )
+        metrics.observe_ack(interaction, "VoteView.vote_button")
         logging.info(f"Botão 'Votar' clicado por {interaction.user}")
 
 class VoteSelectView(discord.ui.View):
-    def __init__(self, db: Database, news_ids: list, user_id: int):
+    def __init__(self, db: AsyncDatabase, news_ids: list, user_id: int):
         super().__init__(timeout=60.0)
         self.db = db
         self.news_ids = news_ids
@@ -306,16 +414,24 @@ class VoteSelectView(discord.ui.View):
 
     async def select_callback(self, interaction: discord.Interaction):
         vote_type = interaction.data["values"][0]
-        self.db.add_user(self.user_id, interaction.user.name)
-        for news_id in self.news_ids:
-            self.db.add_vote(news_id, self.user_id, vote_type)
+        await self.db.add_votes(self.news_ids, self.user_id, vote_type, username=interaction.user.name)
         await interaction.response.send_message(
             f"Voto '{vote_type}' registrado para {len(self.news_ids)} notícias!",
             ephemeral=True
         )
+        metrics.observe_ack(interaction, "VoteSelectView.select")
         logging.info(f"Usuário {interaction.user} votou '{vote_type}' em {len(self.news_ids)} notícias")
 
 async def setup(bot):
-    db = Database()
-    news_service = NewsService(db, bot.config.NEWS_API_KEY)
-    await bot.add_cog(NewsCog(bot, db, news_service))
\ No newline at end of file
+    # Reutiliza as instâncias do bot para compartilhar a sessão HTTP do NewsService
+    message_index = MessageIndex(
+        max_entries=bot.config.MESSAGE_INDEX_SIZE,
+        bloom_capacity=bot.config.MESSAGE_INDEX_BLOOM_CAPACITY
+    )
+    await bot.add_cog(NewsCog(
+        bot, bot.db, bot.news_service, message_index,
+        lookup_dm_misses=bool(bot.config.DISCORD_SHARD_IDS)
+    ))
+    # Views persistentes: os botões continuam funcionando depois de reiniciar o bot
+    bot.add_view(NewsView(bot.db, bot.news_service, message_index))
+    bot.add_view(VoteView(bot.db, message_index))
\ No newline at end of file
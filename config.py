@@ -6,4 +6,91 @@ load_dotenv()
 # Configurações do bot
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-SUMMARY_CHANNEL_ID = int(os.getenv("SUMMARY_CHANNEL_ID", 0))  # ID do canal para resumo diário
\ No newline at end of file
+SUMMARY_CHANNEL_ID = int(os.getenv("SUMMARY_CHANNEL_ID", 0))  # ID do canal para resumo diário
+DATABASE_FILE = os.getenv("DATABASE_FILE", "news.db")  # Arquivo do banco SQLite
+
+# Busca de notícias
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", 10))  # Timeout (s) por requisição a cada fonte
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 8))  # Máximo de requisições simultâneas às fontes
+FETCH_CACHE_TTL_SECONDS = int(os.getenv("FETCH_CACHE_TTL_SECONDS", 300))  # Validade de uma busca por (tópico, fonte)
+FETCH_CACHE_STALE_SECONDS = int(os.getenv("FETCH_CACHE_STALE_SECONDS", 600))  # Tempo extra servindo o cache enquanto atualiza
+
+# Ingestão em segundo plano
+INGEST_INTERVAL_MINUTES = int(os.getenv("INGEST_INTERVAL_MINUTES", 15))  # Intervalo entre ingestões das fontes
+INGEST_LIMIT = int(os.getenv("INGEST_LIMIT", 20))  # Notícias buscadas por tópico em cada ingestão
+NEWS_FRESHNESS_MINUTES = int(os.getenv("NEWS_FRESHNESS_MINUTES", 60))  # Idade máxima do banco antes de forçar busca ao vivo
+
+# Cache de traduções
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", 5000))  # Entradas no LRU em memória
+TRANSLATION_CACHE_MAX_ROWS = int(os.getenv("TRANSLATION_CACHE_MAX_ROWS", 100000))  # Linhas máximas no SQLite
+TRANSLATION_CACHE_TTL_DAYS = float(os.getenv("TRANSLATION_CACHE_TTL_DAYS", 30))  # Validade de uma tradução
+
+# Buffer de votos
+VOTE_BUFFER_SIZE = int(os.getenv("VOTE_BUFFER_SIZE", 100))  # Votos pendentes que disparam gravação imediata
+VOTE_FLUSH_SECONDS = int(os.getenv("VOTE_FLUSH_SECONDS", 5))  # Intervalo máximo até gravar votos pendentes
+
+# Resumo diário
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", 20))  # Envios simultâneos do resumo diário
+SUMMARY_DM_RATE = float(os.getenv("SUMMARY_DM_RATE", 25))  # DMs por segundo (teto global do Discord: 50 req/s)
+SUMMARY_CHANNEL_RATE = float(os.getenv("SUMMARY_CHANNEL_RATE", 1))  # Mensagens por segundo no canal de resumo (rota: 5/5s)
+SUMMARY_LEASE_HOURS = float(os.getenv("SUMMARY_LEASE_HOURS", 12))  # Por quanto tempo o processo que enviou o resumo impede outro envio
+
+# Índice de mensagens de notícias (reações)
+MESSAGE_INDEX_SIZE = int(os.getenv("MESSAGE_INDEX_SIZE", 10000))  # Mensagens com news_ids mantidos em memória
+MESSAGE_INDEX_BLOOM_CAPACITY = int(os.getenv("MESSAGE_INDEX_BLOOM_CAPACITY", 1000000))  # Mensagens cobertas pelo filtro de Bloom
+
+# News API
+NEWSAPI_URL = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2/everything")  # Endpoint de busca (trocável por um servidor local nos benchmarks)
+
+# Orçamento da News API (plano gratuito: 100 requisições por dia)
+NEWSAPI_QUOTA = int(os.getenv("NEWSAPI_QUOTA", 100))  # Requisições permitidas por janela
+NEWSAPI_QUOTA_WINDOW_HOURS = float(os.getenv("NEWSAPI_QUOTA_WINDOW_HOURS", 24))  # Duração da janela móvel
+NEWSAPI_QUOTA_LOW = int(os.getenv("NEWSAPI_QUOTA_LOW", 20))  # Abaixo disso, o RSS passa a ter prioridade
+NEWSAPI_MAX_RETRIES = int(os.getenv("NEWSAPI_MAX_RETRIES", 3))  # Novas tentativas após 429
+NEWSAPI_BACKOFF_BASE = float(os.getenv("NEWSAPI_BACKOFF_BASE", 1))  # Base (s) do backoff exponencial
+NEWSAPI_MAX_BACKOFF = float(os.getenv("NEWSAPI_MAX_BACKOFF", 30))  # Espera máxima (s) antes de desistir
+
+# Disjuntores e requisições com hedge
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))  # Falhas seguidas que abrem o disjuntor de uma fonte
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", 60))  # Tempo aberto antes da chamada de teste
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"  # Limita a espera por uma fonte ao seu p95
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))  # Amostras de latência antes de usar o p95
+
+# Registro de feeds RSS
+FEEDS_FILE = os.getenv("FEEDS_FILE", "feeds.json")  # Arquivo JSON com os feeds (opcional; sem ele, usa o banco)
+FEED_POLL_MINUTES = float(os.getenv("FEED_POLL_MINUTES", 15))  # Intervalo padrão entre buscas de um feed
+FEED_POLL_TICK_SECONDS = int(os.getenv("FEED_POLL_TICK_SECONDS", 30))  # Frequência da verificação de feeds vencidos
+FEED_POLL_BATCH = int(os.getenv("FEED_POLL_BATCH", 50))  # Feeds vencidos buscados por verificação
+FEEDS_PER_TOPIC_LIVE = int(os.getenv("FEEDS_PER_TOPIC_LIVE", 3))  # Feeds mais prioritários usados na busca ao vivo
+SHARD_ID = int(os.getenv("SHARD_ID", 0))  # Shard de feeds atendido por este processo
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 1))  # Total de processos dividindo os feeds
+
+# Shards do Discord (vários processos compartilhando o mesmo banco)
+DISCORD_SHARD_IDS = [int(shard) for shard in os.getenv("DISCORD_SHARD_IDS", "").split(",") if shard.strip()]  # Shards deste processo (vazio: todos)
+DISCORD_SHARD_COUNT = int(os.getenv("DISCORD_SHARD_COUNT", 0))  # Total de shards (0: o recomendado pelo Discord; obrigatório com DISCORD_SHARD_IDS)
+
+# Detecção de notícias quase duplicadas
+DEDUP_INDEX_SIZE = int(os.getenv("DEDUP_INDEX_SIZE", 100000))  # Notícias recentes mantidas no índice de duplicatas
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.6))  # Similaridade (Jaccard) de títulos que conta como duplicata
+
+# Parse de feeds RSS
+FEED_PARSER = os.getenv("FEED_PARSER", "stream").lower()  # "stream" (incremental, para ao atingir o limite) ou "feedparser"
+FEED_CHUNK_SIZE = int(os.getenv("FEED_CHUNK_SIZE", 65536))  # Bytes lidos por vez no parse incremental
+
+# Busca de notícias armazenadas
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 5))  # Resultados por página do /search
+
+# Métricas (formato Prometheus)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # Endereço do endpoint /metrics (local por padrão)
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))  # Porta do endpoint /metrics (0 desativa)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.5))  # Intervalo (s) da medição de atraso do event loop
+
+# Logging
+LOG_FILE = os.getenv("LOG_FILE", "bot.log")  # Arquivo de log (rotacionado por tamanho)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # Nível mínimo registrado
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # "json" (um objeto por linha) ou "text"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 2**20))  # Tamanho do arquivo antes da rotação
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))  # Arquivos rotacionados mantidos
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # Registros pendentes antes de descartar novos
+LOG_SAMPLED_EVENTS = {event for event in os.getenv("LOG_SAMPLED_EVENTS", "reaction,db_read").split(",") if event}  # Eventos de alta frequência amostrados
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 10))  # Registra 1 a cada N desses eventos
@@ -1,28 +1,227 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import json
+import re
 import sqlite3
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from datetime import datetime, timezone
+import metrics
+from models import Article
 
-# Configurar logging
-logging.basicConfig(
-    filename="bot.log",
-    level=logging.INFO,
-    format="%(asctime)s:%(levelname)s:%(message)s"
-)
+# Ajustes de desempenho aplicados à conexão compartilhada
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # Leitores não bloqueiam o escritor
+    "synchronous": "NORMAL",      # Seguro com WAL; evita fsync a cada commit
+    "cache_size": -16000,         # ~16 MB de cache de páginas
+    "mmap_size": 268435456,       # 256 MB mapeados em memória
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000          # ms aguardando locks de outros processos
+}
+STATEMENT_CACHE_SIZE = 256
+SAVE_NEWS_BATCH_SIZE = 500  # Linhas por INSERT em lote (6 parâmetros por linha)
+# Acima disso, a busca ordena por recência: pontuar todas as notícias de um termo
+# muito comum custa caro (~1s com 500 mil resultados) e quase não diferencia a relevância
+SEARCH_RANK_LIMIT = 20000
+
+# Migrações de esquema aplicadas em ordem sobre as tabelas base de init_db.
+# A posição na lista (a partir de 1) é a versão gravada em PRAGMA user_version.
+MIGRATIONS = [
+    (
+        "índices e contador de votos materializado em news",
+        """
+        ALTER TABLE news ADD COLUMN vote_count INTEGER NOT NULL DEFAULT 0;
+        UPDATE news SET vote_count = (SELECT COUNT(*) FROM votes v WHERE v.news_id = news.news_id);
+        CREATE INDEX IF NOT EXISTS idx_news_topic_votes ON news (topic, vote_count DESC, published_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_news_message_id ON news (message_id);
+        CREATE INDEX IF NOT EXISTS idx_news_url ON news (url);
+        CREATE TRIGGER IF NOT EXISTS trg_votes_insert AFTER INSERT ON votes BEGIN
+            UPDATE news SET vote_count = vote_count + 1 WHERE news_id = NEW.news_id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_votes_delete AFTER DELETE ON votes BEGIN
+            UPDATE news SET vote_count = vote_count - 1 WHERE news_id = OLD.news_id;
+        END;
+        """
+    ),
+    (
+        "remoção de notícias duplicadas e URL única",
+        """
+        CREATE TEMP TABLE news_keep AS
+            SELECT url, MIN(news_id) AS keep_id, MAX(message_id) AS message_id
+            FROM news GROUP BY url;
+        UPDATE OR IGNORE votes SET news_id = (
+            SELECT k.keep_id FROM news n JOIN news_keep k ON k.url = n.url
+            WHERE n.news_id = votes.news_id
+        );
+        DELETE FROM votes WHERE news_id NOT IN (SELECT keep_id FROM news_keep);
+        UPDATE news SET message_id = (SELECT k.message_id FROM news_keep k WHERE k.keep_id = news.news_id)
+            WHERE news_id IN (SELECT keep_id FROM news_keep);
+        DELETE FROM news WHERE news_id NOT IN (SELECT keep_id FROM news_keep);
+        UPDATE news SET vote_count = (SELECT COUNT(*) FROM votes v WHERE v.news_id = news.news_id);
+        DROP TABLE news_keep;
+        DROP INDEX IF EXISTS idx_news_url;
+        CREATE UNIQUE INDEX idx_news_url ON news (url);
+        """
+    ),
+    (
+        "tabela message_news (uma mensagem para várias notícias)",
+        """
+        CREATE TABLE IF NOT EXISTS message_news (
+            message_id INTEGER NOT NULL,
+            news_id INTEGER NOT NULL,
+            PRIMARY KEY (message_id, news_id)
+        ) WITHOUT ROWID;
+        INSERT OR IGNORE INTO message_news (message_id, news_id)
+            SELECT message_id, news_id FROM news WHERE message_id IS NOT NULL;
+        DROP INDEX IF EXISTS idx_news_message_id;
+        """
+    ),
+    (
+        "registro de feeds RSS com intervalo, prioridade e shard",
+        """
+        CREATE TABLE IF NOT EXISTS feeds (
+            url TEXT PRIMARY KEY,
+            topic TEXT NOT NULL,
+            poll_interval INTEGER NOT NULL,  -- segundos entre buscas
+            priority INTEGER NOT NULL DEFAULT 0,  -- maior = buscado primeiro ao vivo
+            shard_key INTEGER NOT NULL,  -- crc32 da URL; o shard é shard_key % SHARD_COUNT
+            next_poll_at REAL NOT NULL DEFAULT 0,  -- epoch da próxima busca
+            enabled INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS idx_feeds_due ON feeds (next_poll_at) WHERE enabled = 1;
+        """
+    ),
+    (
+        "URL canônica e assinatura MinHash do título para detectar quase duplicatas",
+        """
+        ALTER TABLE news ADD COLUMN canonical_url TEXT;
+        ALTER TABLE news ADD COLUMN minhash BLOB;
+        """
+    ),
+    (
+        "índice de busca textual (FTS5) sobre título e tópico",
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+            title, topic,
+            content = 'news', content_rowid = 'news_id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+        INSERT INTO news_fts (news_fts) VALUES ('rebuild');
+        CREATE TRIGGER IF NOT EXISTS trg_news_fts_insert AFTER INSERT ON news BEGIN
+            INSERT INTO news_fts (rowid, title, topic) VALUES (NEW.news_id, NEW.title, NEW.topic);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_news_fts_delete AFTER DELETE ON news BEGIN
+            INSERT INTO news_fts (news_fts, rowid, title, topic) VALUES ('delete', OLD.news_id, OLD.title, OLD.topic);
+        END;
+        -- Só título e tópico: o UPSERT de save_news e os votos não reindexam a notícia
+        CREATE TRIGGER IF NOT EXISTS trg_news_fts_update AFTER UPDATE OF title, topic ON news BEGIN
+            INSERT INTO news_fts (news_fts, rowid, title, topic) VALUES ('delete', OLD.news_id, OLD.title, OLD.topic);
+            INSERT INTO news_fts (rowid, title, topic) VALUES (NEW.news_id, NEW.title, NEW.topic);
+        END;
+        """
+    ),
+    (
+        "tabela leases (tarefas executadas por um único processo do cluster)",
+        """
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        """
+    ),
+    (
+        "orçamento de APIs externas compartilhado entre os processos",
+        """
+        CREATE TABLE IF NOT EXISTS api_requests (
+            api TEXT NOT NULL,
+            requested_at REAL NOT NULL  -- epoch da requisição
+        );
+        CREATE INDEX IF NOT EXISTS idx_api_requests ON api_requests (api, requested_at);
+        CREATE TABLE IF NOT EXISTS api_quota (
+            api TEXT PRIMARY KEY,
+            reported_remaining INTEGER,  -- último restante informado pela API
+            reported_at REAL,
+            blocked_until REAL NOT NULL DEFAULT 0  -- epoch até quando não se deve chamar a API
+        );
+        """
+    ),
+]
+
+def _split_statements(script: str) -> list:
+    """Divide um script SQL em comandos, respeitando os ';' dentro de triggers."""
+    statements = []
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \n;"):
+                statements.append(statement)
+            statement = ""
+    return statements
 
 class Database:
-    def __init__(self, db_name="news.db"):
+    def __init__(self, db_name="news.db", vote_buffer_size: int = 100):
         self.db_name = db_name
+        self.vote_buffer_size = vote_buffer_size
+        self._lock = threading.RLock()
+        self._buffer_lock = threading.Lock()
+        self._pending_votes = {}  # (news_id, user_id) -> vote_type
+        self._pending_users = {}  # user_id -> username
+        self._conn = self._connect()
         self.init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Abre a conexão de longa duração e aplica os PRAGMAs de desempenho."""
+        conn = sqlite3.connect(
+            self.db_name,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma}={value}")
+        return conn
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Abre uma conexão somente leitura para consultas em streaming.
+
+        Com WAL, ela lê um snapshot consistente sem prender a conexão compartilhada
+        enquanto o chamador consome os resultados.
+        """
+        conn = sqlite3.connect(f"file:{self.db_name}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
     @contextmanager
     def get_connection(self):
-        """Gerencia a conexão com o banco de dados."""
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """Gerencia o acesso à conexão compartilhada com o banco de dados.
+
+        A conexão é reutilizada entre chamadas e serializada por um lock. Se o bloco
+        falhar, a transação pendente é desfeita para não vazar para o próximo uso.
+        """
+        with self._lock:
+            try:
+                yield self._conn
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+
+    def close(self):
+        """Grava os votos pendentes e fecha a conexão compartilhada."""
+        self.flush_votes()
+        with self._lock:
+            # Transfere o WAL para o arquivo principal antes de sair
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+            logging.info("Conexão com o banco de dados encerrada.")
 
     def init_db(self):
         """Inicializa o banco de dados e cria as tabelas."""
@@ -63,12 +262,64 @@ class Database:
                         FOREIGN KEY (user_id) REFERENCES users(user_id)
                     )
                 """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS topic_refresh (
+                        topic TEXT PRIMARY KEY,
+                        refreshed_at TEXT NOT NULL
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS feed_state (
+                        url TEXT PRIMARY KEY,
+                        etag TEXT,
+                        last_modified TEXT,
+                        last_guid TEXT,
+                        last_published TEXT  -- ISO 8601 (UTC) da entrada mais recente vista
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS translations (
+                        title_hash TEXT NOT NULL,
+                        target_lang TEXT NOT NULL,
+                        translated TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (title_hash, target_lang)
+                    )
+                """)
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_translations_created_at ON translations (created_at)"
+                )
                 conn.commit()
+                self._apply_migrations(conn)
                 logging.info("Banco de dados inicializado com sucesso.")
         except sqlite3.Error as e:
             logging.error(f"Erro ao inicializar o banco de dados: {e}")
             raise
 
+    def _apply_migrations(self, conn: sqlite3.Connection):
+        """Aplica as migrações pendentes, cada uma em sua própria transação.
+
+        A transação é IMMEDIATE e a versão é relida dentro dela: com vários processos
+        iniciando juntos, cada migração é aplicada por um só, e os demais a pulam.
+        """
+        for number, (description, script) in enumerate(MIGRATIONS, start=1):
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= number:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= number:
+                    conn.rollback()
+                    continue
+                # executescript faria COMMIT antes de começar: os comandos vão um a um
+                for statement in _split_statements(script):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            logging.info(f"Migração {number} aplicada: {description}.")
+
     def add_user(self, user_id: int, username: str):
         """Adiciona um usuário ao banco."""
         try:
@@ -109,7 +360,7 @@ class Database:
                     (user_id,)
                 )
                 topics = [row["topic"] for row in cursor.fetchall()]
-                logging.info(f"Tópicos recuperados para usuário {user_id}: {topics}")
+                logging.info(f"{len(topics)} tópicos recuperados para usuário {user_id}", extra={"event": "db_read"})
                 return topics
         except sqlite3.Error as e:
             logging.error(f"Erro ao recuperar assinaturas para usuário {user_id}: {e}")
@@ -131,37 +382,93 @@ class Database:
             raise
 
     def update_news_message_id(self, news_id: int, message_id: int):
-        """Atualiza o message_id de uma notícia no banco."""
+        """Associa uma notícia a uma mensagem (mantido por compatibilidade; use add_message_news)."""
+        self.add_message_news(message_id, [news_id])
+
+    def add_message_news(self, message_id: int, news_ids: list):
+        """Associa várias notícias a uma mensagem em uma única transação."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE news SET message_id = ? WHERE news_id = ?",
-                    (message_id, news_id)
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO message_news (message_id, news_id) VALUES (?, ?)",
+                    [(message_id, news_id) for news_id in news_ids]
                 )
                 conn.commit()
-                logging.info(f"Message ID {message_id} atualizado para notícia {news_id}.")
+                logging.info(f"Mensagem {message_id} associada a {len(news_ids)} notícias.")
         except sqlite3.Error as e:
-            logging.error(f"Erro ao atualizar message_id para notícia {news_id}: {e}")
+            logging.error(f"Erro ao associar notícias à mensagem {message_id}: {e}")
             raise
 
-    def add_vote(self, news_id: int, user_id: int, vote_type: str):
-        """Adiciona ou atualiza um voto para uma notícia."""
+    def add_vote(self, news_id: int, user_id: int, vote_type: str, username: str = None):
+        """Adiciona ou atualiza um voto para uma notícia.
+
+        O voto entra no buffer de escrita e é gravado em lote por flush_votes, junto com
+        o registro do usuário. Sem username, o usuário é registrado só pelo ID (com o ID
+        como nome), sem sobrescrever um nome já gravado.
+        """
+        self.add_votes([news_id], user_id, vote_type, username)
+
+    def add_votes(self, news_ids: list, user_id: int, vote_type: str, username: str = None):
+        """Adiciona ou atualiza o voto de um usuário em várias notícias (via buffer)."""
+        with self._buffer_lock:
+            for news_id in news_ids:
+                # Votos repetidos do mesmo usuário na mesma notícia se sobrescrevem no buffer
+                self._pending_votes[(news_id, user_id)] = vote_type
+            if username is not None or user_id not in self._pending_users:
+                self._pending_users[user_id] = username
+            should_flush = len(self._pending_votes) >= self.vote_buffer_size
+        if should_flush:
+            self.flush_votes()
+
+    def flush_votes(self) -> int:
+        """Grava os votos e usuários pendentes em uma única transação. Retorna o total de votos."""
+        with self._buffer_lock:
+            votes, self._pending_votes = self._pending_votes, {}
+            users, self._pending_users = self._pending_users, {}
+        if not votes and not users:
+            return 0
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT OR REPLACE INTO votes (news_id, user_id, vote_type) VALUES (?, ?, ?)",
-                    (news_id, user_id, vote_type)
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO users (user_id, username) VALUES (?, ?)",
+                    [(user_id, username) for user_id, username in users.items() if username is not None]
+                )
+                cursor.executemany(
+                    # Nome desconhecido (usuário fora do cache): votes.user_id referencia users
+                    "INSERT OR IGNORE INTO users (user_id, username) VALUES (?, ?)",
+                    [(user_id, str(user_id)) for user_id, username in users.items() if username is None]
+                )
+                cursor.executemany(
+                    # UPSERT em vez de OR REPLACE: o REPLACE apaga a linha sem disparar
+                    # trg_votes_delete, o que desajustaria news.vote_count
+                    """
+                    INSERT INTO votes (news_id, user_id, vote_type) VALUES (?, ?, ?)
+                    ON CONFLICT (news_id, user_id) DO UPDATE SET vote_type = excluded.vote_type
+                    """,
+                    [(news_id, user_id, vote_type) for (news_id, user_id), vote_type in votes.items()]
                 )
                 conn.commit()
-                logging.info(f"Voto {vote_type} adicionado para notícia {news_id} por usuário {user_id}.")
+                logging.info(f"Buffer de votos gravado: {len(votes)} votos, {len(users)} usuários.")
+                return len(votes)
         except sqlite3.Error as e:
-            logging.error(f"Erro ao adicionar voto para notícia {news_id} por usuário {user_id}: {e}")
+            # Devolve ao buffer o que falhou, sem sobrescrever votos mais novos
+            with self._buffer_lock:
+                self._pending_votes = {**votes, **self._pending_votes}
+                self._pending_users = {
+                    **users,
+                    **{
+                        user_id: username for user_id, username in self._pending_users.items()
+                        if username is not None or user_id not in users
+                    }
+                }
+            logging.error(f"Erro ao gravar buffer de votos: {e}")
             raise
 
     def get_votes(self, news_id: int) -> list:
         """Retorna a lista de votos para uma notícia."""
+        self.flush_votes()  # Inclui votos ainda no buffer
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -170,7 +477,7 @@ class Database:
                     (news_id,)
                 )
                 votes = [{"user_id": row["user_id"], "vote_type": row["vote_type"]} for row in cursor.fetchall()]
-                logging.info(f"Votos recuperados para notícia {news_id}: {votes}")
+                logging.info(f"{len(votes)} votos recuperados para notícia {news_id}", extra={"event": "db_read"})
                 return votes
         except sqlite3.Error as e:
             logging.error(f"Erro ao recuperar votos para notícia {news_id}: {e}")
@@ -178,33 +485,648 @@ class Database:
 
     def get_top_voted_news(self, topics: list, limit: int = 5) -> list:
         """Retorna as notícias mais votadas para os tópicos especificados."""
+        if not topics:
+            return []
+        self.flush_votes()  # Inclui votos ainda no buffer
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                query = """
-                    SELECT n.news_id, n.title, n.url, n.topic, n.published_at, 
-                           COUNT(v.vote_type) as vote_count
-                    FROM news n
-                    LEFT JOIN votes v ON n.news_id = v.news_id
-                    WHERE n.topic IN ({})
-                    GROUP BY n.news_id
-                    ORDER BY vote_count DESC, n.published_at DESC
-                    LIMIT ?
-                """
-                placeholders = ",".join("?" for _ in topics)
-                cursor.execute(query.format(placeholders), topics + [limit])
-                news = [
-                    {
-                        "news_id": row["news_id"],
-                        "title": row["title"],
-                        "url": row["url"],
-                        "topic": row["topic"],
-                        "vote_count": row["vote_count"]
-                    }
-                    for row in cursor.fetchall()
-                ]
-                logging.info(f"Notícias mais votadas recuperadas: {len(news)} para tópicos {topics}")
+                query, params = self._top_news_per_topic_query(topics, limit)
+                query += " ORDER BY vote_count DESC, published_at DESC LIMIT ?"
+                cursor.execute(query, params + [limit])
+                news = [self._article(row) for row in cursor.fetchall()]
+                logging.info(f"Notícias mais votadas recuperadas: {len(news)} para {len(topics)} tópicos", extra={"event": "db_read"})
                 return news
         except sqlite3.Error as e:
             logging.error(f"Erro ao recuperar notícias mais votadas: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def _article(row: sqlite3.Row) -> Article:
+        """Converte uma linha de news (news_id, title, url, topic, published_at, vote_count) em Article."""
+        return Article(
+            title=row["title"],
+            url=row["url"],
+            topic=row["topic"],
+            published_at=row["published_at"],
+            news_id=row["news_id"],
+            vote_count=row["vote_count"]
+        )
+
+    @staticmethod
+    def _top_news_per_topic_query(topics: list, limit: int):
+        """Monta a consulta das `limit` notícias mais votadas de cada tópico.
+
+        Cada tópico vira uma varredura limitada do índice (topic, vote_count, published_at);
+        os resultados são unidos sem agregar a tabela de votos.
+        """
+        per_topic = """
+            SELECT * FROM (
+                SELECT news_id, title, url, topic, published_at, vote_count
+                FROM news
+                WHERE topic = ?
+                ORDER BY vote_count DESC, published_at DESC
+                LIMIT ?
+            )
+        """
+        query = " UNION ALL ".join(per_topic for _ in topics)
+        params = [value for topic in topics for value in (topic, limit)]
+        return query, params
+
+    def iter_digests(self, limit: int = 3):
+        """Gera (user_id, tópicos, notícias) com as `limit` mais votadas de cada assinante.
+
+        O top-K de cada tópico assinado é calculado uma única vez; as assinaturas são
+        então lidas em ordem de usuário, em streaming, e cada usuário recebe a junção dos
+        top-K dos seus tópicos. A memória depende só do número de tópicos, não de usuários.
+        """
+        self.flush_votes()  # Inclui votos ainda no buffer
+        conn = self._open_reader()
+        try:
+            topics = [row["topic"] for row in conn.execute("SELECT DISTINCT topic FROM subscriptions")]
+            candidates = {topic: [] for topic in topics}
+            if topics:
+                query, params = self._top_news_per_topic_query(topics, limit)
+                for row in conn.execute(query, params):
+                    candidates[row["topic"]].append(self._article(row))
+
+            def rank(news):
+                # Mesma ordenação do SQL: votos, depois data (NULL por último)
+                return news.vote_count, news.published_at is not None, news.published_at or ""
+
+            cursor = conn.execute("SELECT user_id, topic FROM subscriptions ORDER BY user_id, topic")
+            for user_id, rows in itertools.groupby(cursor, key=lambda row: row["user_id"]):
+                user_topics = tuple(row["topic"] for row in rows)
+                news = heapq.nlargest(limit, (news for topic in user_topics for news in candidates[topic]), key=rank)
+                yield user_id, user_topics, news
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao calcular resumos dos assinantes: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def get_latest_news(self, topic: str, limit: int = 5) -> list:
+        """Retorna as notícias mais recentes armazenadas para um tópico."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT news_id, title, url, topic, published_at, vote_count
+                    FROM news
+                    WHERE topic = ?
+                    ORDER BY news_id DESC
+                    LIMIT ?
+                    """,
+                    (topic, limit)
+                )
+                news = [self._article(row) for row in cursor.fetchall()]
+                logging.info(f"Notícias recentes recuperadas do banco: {len(news)} para tópico {topic}", extra={"event": "db_read"})
+                return news
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recuperar notícias recentes para tópico {topic}: {e}")
+            raise
+
+    def search_news(self, query: str, limit: int = 5, offset: int = 0, topic: str = None) -> list:
+        """Busca notícias pelo texto do título e do tópico, das mais relevantes às menos.
+
+        Cada palavra da consulta precisa aparecer na notícia (a última também casa como
+        prefixo). A relevância é o BM25 do índice FTS5, com o título pesando mais que o
+        tópico; empates ficam com as notícias mais recentes. Consultas com mais de
+        SEARCH_RANK_LIMIT resultados são ordenadas só por recência.
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT COUNT(*) FROM (SELECT 1 FROM news_fts WHERE news_fts MATCH ? LIMIT ?)",
+                    (match, SEARCH_RANK_LIMIT + 1)
+                )
+                if cursor.fetchone()[0] <= SEARCH_RANK_LIMIT:
+                    order = "bm25(news_fts, 10.0, 1.0), news_fts.rowid DESC"
+                else:
+                    order = "news_fts.rowid DESC"
+                cursor.execute(
+                    f"""
+                    SELECT n.news_id, n.title, n.url, n.topic, n.published_at, n.vote_count
+                    FROM news_fts JOIN news n ON n.news_id = news_fts.rowid
+                    WHERE news_fts MATCH ? {"AND n.topic = ?" if topic else ""}
+                    ORDER BY {order}
+                    LIMIT ? OFFSET ?
+                    """,
+                    [match] + ([topic] if topic else []) + [limit, offset]
+                )
+                news = [self._article(row) for row in cursor.fetchall()]
+                logging.info(f"Busca por {query!r}: {len(news)} notícias (offset {offset})", extra={"event": "db_read"})
+                return news
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao buscar notícias por {query!r}: {e}")
+            raise
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Converte o texto digitado em uma consulta FTS5 segura (sem operadores do usuário)."""
+        words = re.findall(r"\w+", query)
+        if not words:
+            return ""
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def mark_topic_refreshed(self, topic: str):
+        """Registra o horário da última atualização de um tópico."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT OR REPLACE INTO topic_refresh (topic, refreshed_at) VALUES (?, ?)",
+                    (topic, datetime.now(timezone.utc).isoformat())
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao registrar atualização do tópico {topic}: {e}")
+            raise
+
+    def get_topic_refreshed_at(self, topic: str):
+        """Retorna o horário (UTC) da última atualização de um tópico, ou None."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT refreshed_at FROM topic_refresh WHERE topic = ?",
+                    (topic,)
+                )
+                row = cursor.fetchone()
+                return datetime.fromisoformat(row["refreshed_at"]) if row else None
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recuperar atualização do tópico {topic}: {e}")
+            raise
+
+    def get_feed_state(self, url: str) -> dict:
+        """Retorna os validadores HTTP e a última entrada vista de um feed."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT etag, last_modified, last_guid, last_published FROM feed_state WHERE url = ?",
+                    (url,)
+                )
+                row = cursor.fetchone()
+                return dict(row) if row else {}
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recuperar estado do feed {url}: {e}")
+            raise
+
+    def save_feed_state(self, url: str, etag: str, last_modified: str, last_guid: str, last_published: str):
+        """Salva os validadores HTTP e a última entrada vista de um feed."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO feed_state (url, etag, last_modified, last_guid, last_published)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (url, etag, last_modified, last_guid, last_published)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao salvar estado do feed {url}: {e}")
+            raise
+
+    def upsert_feeds(self, feeds: list, disable_missing: bool = False):
+        """Cadastra ou atualiza feeds no formato (url, topic, poll_interval, priority, shard_key, next_poll_at).
+
+        Feeds já cadastrados mantêm o next_poll_at, para não perder a posição no agendamento.
+        Com disable_missing, os feeds fora da lista são desativados na mesma transação.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    """
+                    INSERT INTO feeds (url, topic, poll_interval, priority, shard_key, next_poll_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (url) DO UPDATE SET
+                        topic = excluded.topic,
+                        poll_interval = excluded.poll_interval,
+                        priority = excluded.priority,
+                        enabled = 1
+                    """,
+                    feeds
+                )
+                disabled = 0
+                if disable_missing:
+                    # Uma lista JSON como parâmetro único evita o limite de variáveis do SQLite
+                    cursor.execute(
+                        "UPDATE feeds SET enabled = 0 WHERE enabled = 1 AND url NOT IN (SELECT value FROM json_each(?))",
+                        (json.dumps([feed[0] for feed in feeds]),)
+                    )
+                    disabled = cursor.rowcount
+                conn.commit()
+                logging.info(f"Registro de feeds atualizado: {len(feeds)} feeds, {disabled} desativados.")
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao atualizar registro de feeds: {e}")
+            raise
+
+    def get_feeds(self) -> list:
+        """Retorna os feeds ativos, na ordem de cadastro."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT url, topic, poll_interval, priority FROM feeds
+                    WHERE enabled = 1 ORDER BY rowid
+                    """
+                )
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recuperar registro de feeds: {e}")
+            raise
+
+    def claim_due_feeds(self, now: float, shard_id: int, shard_count: int, limit: int) -> list:
+        """Reserva para este processo os feeds vencidos do seu shard e os reagenda.
+
+        A reserva é um compare-and-set em next_poll_at: se outro processo reagendou o
+        feed entre a leitura e a escrita, o UPDATE não afeta linhas e o feed é ignorado.
+        O próximo horário mantém a fase do feed (múltiplo do intervalo), para que os feeds
+        continuem espalhados no tempo mesmo após atrasos.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT url, topic, poll_interval, priority, next_poll_at FROM feeds
+                    WHERE enabled = 1 AND next_poll_at <= ? AND shard_key % ? = ?
+                    ORDER BY priority DESC, next_poll_at
+                    LIMIT ?
+                    """,
+                    (now, shard_count, shard_id, limit)
+                )
+                claimed = []
+                for row in cursor.fetchall():
+                    interval = row["poll_interval"]
+                    next_poll_at = row["next_poll_at"] + interval * ((now - row["next_poll_at"]) // interval + 1)
+                    cursor.execute(
+                        "UPDATE feeds SET next_poll_at = ? WHERE url = ? AND next_poll_at = ?",
+                        (next_poll_at, row["url"], row["next_poll_at"])
+                    )
+                    if cursor.rowcount:
+                        claimed.append({
+                            "url": row["url"],
+                            "topic": row["topic"],
+                            "poll_interval": interval,
+                            "priority": row["priority"]
+                        })
+                conn.commit()
+                return claimed
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao reservar feeds vencidos do shard {shard_id}: {e}")
+            raise
+
+    def try_acquire_lease(self, name: str, holder: str, ttl_seconds: float, now: float) -> bool:
+        """Tenta obter (ou renovar) a lease `name` por `ttl_seconds`; retorna se conseguiu.
+
+        A lease só muda de dono depois de expirar. Como o UPSERT é um único comando, dois
+        processos disputando a mesma lease vencida não podem ambos obtê-la.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+                    WHERE leases.expires_at <= ? OR leases.holder = excluded.holder
+                    """,
+                    (name, holder, now + ttl_seconds, now)
+                )
+                conn.commit()
+                acquired = cursor.rowcount == 1
+                logging.info(f"Lease {name} {'obtida' if acquired else 'pertence a outro processo'} ({holder}).")
+                return acquired
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao obter a lease {name}: {e}")
+            raise
+
+    @staticmethod
+    def _api_quota(cursor: sqlite3.Cursor, api: str, limit: int, window_seconds: float, now: float) -> tuple:
+        """Retorna (restante, bloqueada_até) do orçamento de uma API na janela móvel."""
+        cursor.execute(
+            "SELECT COUNT(*) FROM api_requests WHERE api = ? AND requested_at > ?",
+            (api, now - window_seconds)
+        )
+        remaining = limit - cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT reported_remaining, reported_at, blocked_until FROM api_quota WHERE api = ?",
+            (api,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return max(0, remaining), 0.0
+        # O valor informado pela API só vale dentro da janela em que foi recebido
+        if row["reported_remaining"] is not None and now - row["reported_at"] < window_seconds:
+            remaining = min(remaining, row["reported_remaining"])
+        return max(0, remaining), row["blocked_until"]
+
+    def get_api_quota(self, api: str, limit: int, window_seconds: float, now: float) -> tuple:
+        """Retorna (restante, bloqueada_até) do orçamento de uma API, somando todos os processos."""
+        try:
+            with self.get_connection() as conn:
+                return self._api_quota(conn.cursor(), api, limit, window_seconds, now)
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recuperar orçamento da API {api}: {e}")
+            raise
+
+    def reserve_api_request(self, api: str, limit: int, window_seconds: float, now: float):
+        """Reserva uma requisição no orçamento de uma API; retorna o restante depois dela, ou None.
+
+        Retorna None se a API estiver bloqueada ou o orçamento da janela acabou. A leitura e
+        a reserva ficam na mesma transação IMMEDIATE: processos concorrentes não excedem o
+        limite.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(
+                    "DELETE FROM api_requests WHERE api = ? AND requested_at <= ?",
+                    (api, now - window_seconds)
+                )
+                remaining, blocked_until = self._api_quota(cursor, api, limit, window_seconds, now)
+                if now < blocked_until or remaining <= 0:
+                    conn.commit()
+                    return None
+                cursor.execute("INSERT INTO api_requests (api, requested_at) VALUES (?, ?)", (api, now))
+                cursor.execute(
+                    "UPDATE api_quota SET reported_remaining = reported_remaining - 1 WHERE api = ? AND reported_remaining IS NOT NULL",
+                    (api,)
+                )
+                conn.commit()
+                return remaining - 1
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao reservar requisição no orçamento da API {api}: {e}")
+            raise
+
+    def save_api_quota(self, api: str, reported_remaining: int = None, reported_at: float = None, blocked_until: float = None):
+        """Grava o restante informado pela API e/ou estende o bloqueio dela (o maior prazo vence)."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO api_quota (api, reported_remaining, reported_at, blocked_until)
+                    VALUES (?, ?, ?, COALESCE(?, 0))
+                    ON CONFLICT (api) DO UPDATE SET
+                        reported_remaining = COALESCE(excluded.reported_remaining, reported_remaining),
+                        reported_at = COALESCE(excluded.reported_at, reported_at),
+                        blocked_until = MAX(blocked_until, excluded.blocked_until)
+                    """,
+                    (api, reported_remaining, reported_at, blocked_until)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao salvar orçamento da API {api}: {e}")
+            raise
+
+    def get_translations(self, title_hashes: list, target_lang: str, min_created_at: float) -> dict:
+        """Retorna {title_hash: (tradução, created_at)} para as traduções ainda válidas."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                translations = {}
+                for start in range(0, len(title_hashes), 500):
+                    chunk = title_hashes[start:start + 500]
+                    placeholders = ",".join("?" for _ in chunk)
+                    cursor.execute(
+                        f"""
+                        SELECT title_hash, translated, created_at FROM translations
+                        WHERE target_lang = ? AND created_at >= ? AND title_hash IN ({placeholders})
+                        """,
+                        [target_lang, min_created_at] + chunk
+                    )
+                    for row in cursor.fetchall():
+                        translations[row["title_hash"]] = (row["translated"], row["created_at"])
+                return translations
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recuperar traduções para {target_lang}: {e}")
+            raise
+
+    def save_translations(self, rows: list):
+        """Salva traduções no formato (title_hash, target_lang, tradução, created_at)."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    """
+                    INSERT OR REPLACE INTO translations (title_hash, target_lang, translated, created_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    rows
+                )
+                conn.commit()
+                logging.info(f"Salvas {len(rows)} traduções no cache.")
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao salvar traduções: {e}")
+            raise
+
+    def prune_translations(self, min_created_at: float, max_rows: int) -> int:
+        """Remove traduções expiradas e as mais antigas além de max_rows. Retorna o total removido."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM translations WHERE created_at < ?", (min_created_at,))
+                removed = cursor.rowcount
+                cursor.execute(
+                    """
+                    DELETE FROM translations WHERE rowid IN (
+                        SELECT rowid FROM translations ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (max_rows,)
+                )
+                removed += cursor.rowcount
+                conn.commit()
+                return removed
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao podar cache de traduções: {e}")
+            raise
+
+    def save_news(self, news_list: list) -> list:
+        """Salva notícias no banco de dados e retorna os news_id, na ordem de news_list.
+
+        Usa um único INSERT em lote com UPSERT pela URL: notícias já salvas não são
+        duplicadas, mas também têm seu news_id retornado.
+        """
+        if not news_list:
+            return []
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COALESCE(MAX(news_id), 0) FROM news")
+                last_id = cursor.fetchone()[0]
+                ids_by_url = {}
+                for start in range(0, len(news_list), SAVE_NEWS_BATCH_SIZE):
+                    batch = news_list[start:start + SAVE_NEWS_BATCH_SIZE]
+                    values = ",".join("(?, ?, ?, ?, ?, ?)" for _ in batch)
+                    params = [
+                        value
+                        for news in batch
+                        for value in (
+                            news.title, news.url.strip(), news.topic, news.published_at,
+                            news.canonical_url, news.minhash
+                        )
+                    ]
+                    # O DO UPDATE sem efeito faz o RETURNING incluir as linhas já existentes
+                    cursor.execute(
+                        f"""
+                        INSERT INTO news (title, url, topic, published_at, canonical_url, minhash) VALUES {values}
+                        ON CONFLICT (url) DO UPDATE SET url = excluded.url
+                        RETURNING news_id, url
+                        """,
+                        params
+                    )
+                    ids_by_url.update((row["url"], row["news_id"]) for row in cursor.fetchall())
+                conn.commit()
+                news_ids = [ids_by_url[news.url.strip()] for news in news_list]
+                inserted = sum(1 for news_id in set(news_ids) if news_id > last_id)
+                logging.info(f"Salvas {len(news_list)} notícias no banco ({inserted} novas).")
+                return news_ids
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao salvar notícias: {e}")
+            raise
+
+    def get_news_ids_by_message(self, message_id: int) -> list:
+        """Retorna os news_id associados a uma mensagem."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT news_id FROM message_news WHERE message_id = ?",
+                    (message_id,)
+                )
+                return [row["news_id"] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recuperar notícias da mensagem {message_id}: {e}")
+            raise
+
+    def iter_news_messages(self):
+        """Gera (message_id, news_ids) de todas as mensagens de notícias, da mais antiga à mais nova."""
+        conn = self._open_reader()
+        try:
+            cursor = conn.execute(
+                "SELECT message_id, news_id FROM message_news ORDER BY message_id"
+            )
+            for message_id, rows in itertools.groupby(cursor, key=lambda row: row["message_id"]):
+                yield message_id, [row["news_id"] for row in rows]
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao carregar mensagens de notícias: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def iter_fingerprints(self, limit: int):
+        """Gera (news_id, title, url, canonical_url, minhash) das `limit` notícias mais recentes, da mais antiga à mais nova."""
+        conn = self._open_reader()
+        try:
+            cursor = conn.execute(
+                """
+                SELECT * FROM (
+                    SELECT news_id, title, url, canonical_url, minhash FROM news
+                    ORDER BY news_id DESC LIMIT ?
+                ) ORDER BY news_id
+                """,
+                (limit,)
+            )
+            for row in cursor:
+                yield row["news_id"], row["title"], row["url"], row["canonical_url"], row["minhash"]
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao carregar assinaturas das notícias: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def save_fingerprints(self, rows: list):
+        """Grava assinaturas calculadas depois no formato (canonical_url, minhash, news_id)."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    "UPDATE news SET canonical_url = ?, minhash = ? WHERE news_id = ?",
+                    rows
+                )
+                conn.commit()
+                logging.info(f"Assinaturas de {len(rows)} notícias antigas gravadas.")
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao gravar assinaturas das notícias: {e}")
+            raise
+
+class AsyncDatabase:
+    """Fachada assíncrona sobre Database.
+
+    Cada método público de Database fica disponível como corrotina, executada em uma
+    thread dedicada ao banco, para que o I/O do SQLite não bloqueie o event loop.
+    Usar uma única thread serializa os acessos na mesma ordem em que foram pedidos.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+
+    async def run(self, func, *args, **kwargs):
+        """Executa uma função síncrona qualquer na thread do banco."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if name.startswith("_") or name == "get_connection" or not callable(attr):
+            raise AttributeError(f"'{type(self).__name__}' não expõe '{name}'")
+
+        def timed(*args, **kwargs):
+            # Medido na thread do banco: só a execução, sem a espera na fila
+            started_at = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            except Exception:
+                metrics.DB_ERRORS.inc(method=name)
+                raise
+            finally:
+                metrics.DB_DURATION.observe(time.perf_counter() - started_at, method=name)
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(timed, *args, **kwargs)
+
+        # Guarda o wrapper para não recriá-lo a cada acesso
+        setattr(self, name, method)
+        return method
+
+    async def stream(self, name: str, *args, batch_size: int = 500, **kwargs):
+        """Consome um método gerador de Database em lotes, sempre na thread do banco."""
+        iterator = await self.run(lambda: iter(getattr(self.db, name)(*args, **kwargs)))
+
+        def next_batch():
+            with metrics.DB_DURATION.time(method=name):
+                return list(itertools.islice(iterator, batch_size))
+
+        try:
+            while True:
+                batch = await self.run(next_batch)
+                if not batch:
+                    return
+                for item in batch:
+                    yield item
+        finally:
+            await self.run(iterator.close)
+
+    async def close(self):
+        """Fecha a conexão na thread do banco e encerra a thread."""
+        await self.run(self.db.close)
+        self._executor.shutdown(wait=True)
+
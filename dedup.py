@@ -0,0 +1,133 @@
+import hashlib
+import re
+from array import array
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from models import Article
+
+# Parâmetros de rastreamento removidos da URL canônica (além de utm_*)
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ocid", "cmpid", "ref", "ref_src"}
+# Palavras ignoradas na comparação de títulos
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "is", "are", "was", "with",
+    "at", "by", "from", "as", "it", "its", "this", "that", "be", "new"
+}
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bandas de 4 valores: candidatos a partir de ~50% de similaridade
+MIN_TITLE_TOKENS = 3  # Títulos mais curtos só são comparados pela URL
+
+# Cada salt gera 16 funções de hash de 32 bits (digest de 64 bytes). Os salts são fixos
+# para que as assinaturas gravadas no banco valham entre execuções e processos.
+_SALTS = [bytes([index]) * 16 for index in range(MINHASH_PERMUTATIONS // 16)]
+
+def canonical_url(url: str) -> str:
+    """Normaliza uma URL para comparar notícias: sem rastreamento, fragmento, www ou esquema."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    # http e https apontam para a mesma notícia: o esquema fica fora da forma canônica
+    return urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+
+def title_tokens(title: str) -> set:
+    """Retorna as palavras significativas do título, em minúsculas."""
+    return {word for word in re.findall(r"\w+", title.lower()) if word not in STOPWORDS}
+
+def minhash(title: str):
+    """Assinatura MinHash do título (bytes), ou None se o título for curto demais."""
+    tokens = title_tokens(title)
+    if len(tokens) < MIN_TITLE_TOKENS:
+        return None
+    rows = []
+    for token in tokens:
+        encoded = token.encode("utf-8")
+        rows.append(array("I", b"".join(hashlib.blake2b(encoded, salt=salt).digest() for salt in _SALTS)))
+    # O mínimo de cada função de hash sobre as palavras do título
+    return array("I", map(min, *rows)).tobytes()
+
+def with_fingerprint(news: Article) -> Article:
+    """Retorna a notícia com `canonical_url` e `minhash` calculados (se ainda não tiver)."""
+    if news.canonical_url is not None:
+        return news
+    return news._replace(canonical_url=canonical_url(news.url), minhash=minhash(news.title))
+
+class DuplicateIndex:
+    """Índice de notícias já vistas, por URL canônica e por títulos quase iguais.
+
+    Os títulos são comparados por MinHash com LSH: cada assinatura é dividida em
+    bandas, e só as notícias que coincidem em alguma banda são comparadas. A busca
+    não depende do total de notícias no índice. Guarda as `max_entries` mais recentes.
+    """
+
+    def __init__(self, max_entries: int, threshold: float):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries = OrderedDict()  # URL canônica -> assinatura (ou None)
+        self._buckets = {}  # hash da banda -> URL canônica, ou lista delas em caso de colisão
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def find(self, canonical: str, signature) -> str:
+        """Retorna a URL canônica de uma notícia equivalente já vista, ou None."""
+        if canonical in self._entries:
+            return canonical
+        if signature is None:
+            return None
+        values = array("I", signature)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            for candidate in [bucket] if isinstance(bucket, str) else bucket or ():
+                other = array("I", self._entries[candidate])
+                if sum(x == y for x, y in zip(values, other)) / len(values) >= self.threshold:
+                    return candidate
+        return None
+
+    def add(self, canonical: str, signature):
+        """Registra uma notícia, descartando as mais antigas além de max_entries."""
+        if canonical in self._entries:
+            return
+        self._entries[canonical] = signature
+        if signature is not None:
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    self._buckets[key] = canonical
+                elif isinstance(bucket, str):
+                    self._buckets[key] = [bucket, canonical]
+                else:
+                    bucket.append(canonical)
+        while len(self._entries) > self.max_entries:
+            self._evict()
+
+    def add_if_new(self, canonical: str, signature) -> bool:
+        """Registra a notícia se não houver equivalente no índice. Retorna se era nova."""
+        if self.find(canonical, signature) is not None:
+            return False
+        self.add(canonical, signature)
+        return True
+
+    def _evict(self):
+        canonical, signature = self._entries.popitem(last=False)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket == canonical:
+                del self._buckets[key]
+            elif isinstance(bucket, list) and canonical in bucket:
+                bucket.remove(canonical)
+                if len(bucket) == 1:
+                    self._buckets[key] = bucket[0]
+
+    @staticmethod
+    def _band_keys(signature: bytes):
+        width = len(signature) // LSH_BANDS
+        return (hash((band, signature[band * width:(band + 1) * width])) for band in range(LSH_BANDS))
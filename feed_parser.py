@@ -0,0 +1,152 @@
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import feedparser
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+# Namespaces aceitos nos campos principais: RSS 2.0 (sem namespace), Atom e RSS 1.0
+_ENTRY_NAMESPACES = ("", ATOM_NS, RSS1_NS)
+_DATE_FIELDS = {"pubDate": 0, "published": 0, "date": 1, "updated": 2}  # menor = preferido
+
+def _split_tag(tag: str):
+    if tag.startswith("{"):
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+def _iso_utc(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def parse_date(value: str):
+    """Converte datas RFC 822 (RSS) ou ISO 8601 (Atom) para ISO 8601 em UTC, ou None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return _iso_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return _iso_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+class FeedStreamParser:
+    """Parser incremental de RSS 2.0, RSS 1.0 e Atom.
+
+    Recebe o documento em pedaços e devolve as entradas normalizadas assim que cada
+    uma termina. Entradas processadas são removidas da árvore, de modo que a memória
+    não cresce com o tamanho do feed. Levanta xml.etree.ElementTree.ParseError para
+    documentos que não são XML bem formado.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack = []
+
+    def feed(self, chunk: bytes) -> list:
+        """Processa um pedaço do documento e retorna as entradas completadas nele."""
+        self._parser.feed(chunk)
+        return self._read_events()
+
+    def close(self) -> list:
+        """Finaliza o documento e retorna as entradas restantes."""
+        self._parser.close()
+        return self._read_events()
+
+    def _read_events(self) -> list:
+        entries = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                self._stack.append(element)
+                continue
+            self._stack.pop()
+            namespace, local = _split_tag(element.tag)
+            if local in ("item", "entry") and namespace in _ENTRY_NAMESPACES:
+                entries.append(self._normalize(element))
+                if self._stack:
+                    self._stack[-1].remove(element)
+        return entries
+
+    @staticmethod
+    def _normalize(element) -> dict:
+        fields = {}
+        published = None
+        published_rank = len(_DATE_FIELDS)
+        for child in element:
+            namespace, local = _split_tag(child.tag)
+            text = (child.text or "").strip()
+            if local in _DATE_FIELDS and namespace in _ENTRY_NAMESPACES + (DC_NS,):
+                if _DATE_FIELDS[local] < published_rank and text:
+                    published, published_rank = text, _DATE_FIELDS[local]
+            elif namespace not in _ENTRY_NAMESPACES:
+                continue
+            elif local == "link":
+                # Atom: <link rel="alternate" href="..."/>; RSS: <link>url</link>
+                href = child.get("href")
+                if href is None:
+                    fields.setdefault("link", text)
+                elif child.get("rel", "alternate") == "alternate":
+                    fields["link"] = href.strip()
+            elif local in ("title", "guid", "id"):
+                fields.setdefault(local, text)
+        link = fields.get("link", "")
+        return {
+            "id": fields.get("guid") or fields.get("id") or link,
+            "title": fields.get("title", ""),
+            "link": link,
+            "published": published,
+            "published_iso": parse_date(published)
+        }
+
+def parse_with_feedparser(body: bytes) -> list:
+    """Faz o parse do documento inteiro com o feedparser e retorna as entradas normalizadas."""
+    entries = []
+    for entry in feedparser.parse(body).entries:
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        entries.append({
+            "id": entry.get("id", entry.get("link")),
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "published": entry.get("published"),
+            "published_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", parsed) if parsed else None
+        })
+    return entries
+
+class EntrySelector:
+    """Seleciona as entradas novas de um feed, na ordem em que chegam.
+
+    Feeds listam da mais nova para a mais antiga: a seleção termina ao reencontrar a
+    última entrada vista ou ao juntar `limit` entradas novas. Também registra a entrada
+    mais nova e a data mais recente vista, para o estado do feed.
+    """
+
+    def __init__(self, state: dict, limit: int):
+        self.last_guid = state.get("last_guid")
+        self.min_published = state.get("last_published")
+        self.limit = limit
+        self.entries = []
+        self.newest_id = None
+        self.last_published = state.get("last_published")
+        self.done = False
+
+    def offer(self, entry: dict) -> bool:
+        """Considera a próxima entrada do feed. Retorna True quando não precisa de mais nenhuma."""
+        if self.done:
+            return True
+        if self.newest_id is None:
+            self.newest_id = entry["id"]
+        published = entry["published_iso"]
+        if published and (self.last_published is None or published > self.last_published):
+            self.last_published = published
+        if self.last_guid and entry["id"] == self.last_guid:
+            self.done = True
+        elif not (self.min_published and published and published <= self.min_published):
+            self.entries.append(entry)
+            self.done = len(self.entries) >= self.limit
+        return self.done
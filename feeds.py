@@ -0,0 +1,89 @@
+import json
+import logging
+import os
+import time
+import zlib
+from database import AsyncDatabase
+
+# Feeds cadastrados quando o registro está vazio e não há arquivo de feeds
+DEFAULT_FEEDS = [
+    {"url": "http://feeds.bbci.co.uk/news/technology/rss.xml", "topic": "tecnologia"},
+    {"url": "https://www.engadget.com/rss.xml", "topic": "games"},
+    {"url": "https://www.darkreading.com/rss.xml", "topic": "ciberseguranca"}
+]
+
+def shard_key(key: str) -> int:
+    """Hash estável (igual em todos os processos) usado para particionar feeds e tópicos."""
+    return zlib.crc32(key.encode("utf-8"))
+
+class FeedRegistry:
+    """Registro dos feeds RSS por tópico, persistido na tabela `feeds`.
+
+    Cada feed tem intervalo de busca e prioridade próprios. Vários processos podem
+    dividir os feeds: cada um atende ao shard `shard_id` de `shard_count`, escolhido
+    pelo hash da URL, e reserva os feeds vencidos no banco compartilhado.
+    """
+
+    def __init__(self, db: AsyncDatabase, shard_id: int, shard_count: int, default_poll_seconds: int):
+        if not 0 <= shard_id < shard_count:
+            raise ValueError(f"SHARD_ID {shard_id} fora do intervalo de SHARD_COUNT {shard_count}")
+        self.db = db
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self.default_poll_seconds = default_poll_seconds
+        self._by_topic = {}  # tópico -> feeds ordenados por prioridade
+
+    async def load(self, feeds_file: str = None):
+        """Sincroniza o banco com o arquivo de feeds (se existir) e carrega o registro.
+
+        Feeds cadastrados que não estão no arquivo são desativados. Sem arquivo, usa os
+        feeds já cadastrados no banco; com o banco vazio, cadastra DEFAULT_FEEDS.
+        """
+        feeds = None
+        from_file = bool(feeds_file) and os.path.exists(feeds_file)
+        if from_file:
+            with open(feeds_file, encoding="utf-8") as f:
+                feeds = json.load(f)
+            logging.info(f"Carregados {len(feeds)} feeds de {feeds_file}")
+        elif not await self.db.get_feeds():
+            feeds = DEFAULT_FEEDS
+        if feeds is not None:
+            await self.db.upsert_feeds([self._feed_row(feed) for feed in feeds], disable_missing=from_file)
+        await self.refresh()
+
+    async def refresh(self):
+        """Recarrega o registro em memória a partir do banco."""
+        by_topic = {}
+        for feed in await self.db.get_feeds():
+            by_topic.setdefault(feed["topic"], []).append(feed)
+        for feeds in by_topic.values():
+            feeds.sort(key=lambda feed: feed["priority"], reverse=True)
+        self._by_topic = by_topic
+        logging.info(
+            f"Registro de feeds: {sum(len(feeds) for feeds in by_topic.values())} feeds "
+            f"em {len(by_topic)} tópicos (shard {self.shard_id}/{self.shard_count})"
+        )
+
+    def topics(self) -> list:
+        """Retorna os tópicos com feeds cadastrados, na ordem de cadastro."""
+        return list(self._by_topic)
+
+    def feeds_for(self, topic: str, limit: int = None) -> list:
+        """Retorna os feeds de um tópico, dos mais prioritários aos menos."""
+        return self._by_topic.get(topic, [])[:limit]
+
+    def owns(self, key: str) -> bool:
+        """Indica se a chave (URL ou tópico) pertence ao shard deste processo."""
+        return shard_key(key) % self.shard_count == self.shard_id
+
+    async def claim_due(self, limit: int) -> list:
+        """Reserva os feeds vencidos deste shard, reagendando-os no banco."""
+        return await self.db.claim_due_feeds(time.time(), self.shard_id, self.shard_count, limit)
+
+    def _feed_row(self, feed: dict) -> tuple:
+        url = feed["url"].strip()
+        poll_interval = int(feed.get("poll_minutes", 0) * 60) or self.default_poll_seconds
+        key = shard_key(url)
+        # A fase derivada do hash espalha as buscas pelo intervalo, em vez de todas de uma vez
+        next_poll_at = time.time() + key % poll_interval
+        return (url, feed["topic"], poll_interval, int(feed.get("priority", 0)), key, next_poll_at)
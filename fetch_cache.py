@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import time
+
+class FetchCache:
+    """Cache TTL de resultados de busca, com coalescência de requisições (singleflight).
+
+    Buscas simultâneas da mesma chave compartilham uma única requisição em andamento.
+    Depois do TTL, a entrada ainda é servida por `stale_seconds` enquanto uma única
+    atualização roda em segundo plano (stale-while-revalidate).
+    """
+
+    def __init__(self, ttl_seconds: float, stale_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries = {}  # chave -> (armazenado_em, valor)
+        self._inflight = {}  # chave -> asyncio.Task da busca em andamento
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key, fetch):
+        """Retorna o valor da chave, chamando `fetch()` (corrotina) apenas se necessário."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return entry[1]
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                self._refresh(key, fetch)
+                return entry[1]
+        self.misses += 1
+        # shield: se um dos chamadores for cancelado, a busca compartilhada continua
+        return await asyncio.shield(self._refresh(key, fetch))
+
+    def peek(self, key):
+        """Retorna o último valor armazenado da chave, mesmo expirado, ou None."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def stats(self) -> dict:
+        """Retorna os contadores do cache."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries)
+        }
+
+    def _refresh(self, key, fetch) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.create_task(self._run(key, fetch))
+        # Marca a exceção como tratada quando ninguém aguarda (atualização em segundo plano)
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = task
+        return task
+
+    async def _run(self, key, fetch):
+        try:
+            value = await fetch()
+            self._entries[key] = (time.monotonic(), value)
+            return value
+        except Exception as e:
+            logging.error(f"Erro ao atualizar cache de busca para {key}: {e!r}")
+            raise
+        finally:
+            self._inflight.pop(key, None)
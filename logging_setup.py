@@ -0,0 +1,104 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+import metrics
+
+# Atributos padrão de LogRecord; os demais vieram de `extra=` e vão para o JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON por linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Deixa passar 1 a cada `every` registros de eventos de alta frequência.
+
+    O evento é indicado com `extra={"event": ...}`; registros sem evento listado, e
+    avisos ou erros, passam sempre.
+    """
+
+    def __init__(self, events: set, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts = dict.fromkeys(events, 0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        if event not in self._counts or record.levelno >= logging.WARNING:
+            return True
+        count = self._counts[event]
+        self._counts[event] = count + 1
+        if count % self.every == 0:
+            record.sampled_every = self.every
+            return True
+        metrics.LOG_RECORDS_DROPPED.inc(reason="sampled")
+        return False
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta o registro (em vez de bloquear) se a fila estiver cheia."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A fila é do mesmo processo: o registro segue sem cópia e a formatação fica
+        # para a thread de escrita. Só os args são resolvidos, caso sejam alterados depois.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_RECORDS_DROPPED.inc(reason="queue_full")
+
+def setup_logging(
+    filename: str,
+    level: str = "INFO",
+    fmt: str = "json",
+    max_bytes: int = 10 * 2**20,
+    backup_count: int = 5,
+    queue_size: int = 10000,
+    sampled_events: set = frozenset(),
+    sample_every: int = 1
+) -> logging.handlers.QueueListener:
+    """Configura o logger raiz para gravar em arquivo por uma thread de fundo.
+
+    Quem loga só coloca o registro em uma fila; formatação, escrita e rotação do arquivo
+    acontecem na thread do QueueListener, de modo que um disco lento não trava o event
+    loop. Retorna o listener, que é parado automaticamente ao sair do processo.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    if fmt == "json":
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter("%(asctime)s:%(levelname)s:%(message)s"))
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    if sampled_events:
+        queue_handler.addFilter(SamplingFilter(set(sampled_events), sample_every))
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    root.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    # Esvazia a fila antes do encerramento do logging
+    atexit.register(listener.stop)
+    return listener
@@ -3,80 +3,233 @@ from discord import app_commands
 from discord.ext import commands
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import config
-from database import Database
+import metrics
+from database import AsyncDatabase, Database
 from news import NewsService
+import asyncio
 import logging
+import os
+import socket
+import time
+from datetime import datetime
+from logging_setup import setup_logging
+from ratelimit import TokenBucket
 
-# Configurar logging
-logging.basicConfig(
-    filename="bot.log",
-    level=logging.INFO,
-    format="%(asctime)s:%(levelname)s:%(message)s"
+# Configurar logging (escrita em arquivo por uma thread de fundo)
+setup_logging(
+    config.LOG_FILE,
+    level=config.LOG_LEVEL,
+    fmt=config.LOG_FORMAT,
+    max_bytes=config.LOG_MAX_BYTES,
+    backup_count=config.LOG_BACKUP_COUNT,
+    queue_size=config.LOG_QUEUE_SIZE,
+    sampled_events=config.LOG_SAMPLED_EVENTS,
+    sample_every=config.LOG_SAMPLE_EVERY
 )
 
-class NewsBot(commands.Bot):
+class NewsBot(commands.AutoShardedBot):
     def __init__(self):
-        super().__init__(command_prefix="!", intents=discord.Intents.default())
+        super().__init__(
+            command_prefix="!",
+            intents=discord.Intents.default(),
+            # Sem DISCORD_SHARD_IDS, este processo conecta todos os shards
+            shard_ids=config.DISCORD_SHARD_IDS or None,
+            shard_count=config.DISCORD_SHARD_COUNT or None
+        )
         self.config = config
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}"  # Dono das leases deste processo
         self.scheduler = AsyncIOScheduler()
-        self.db = Database()
+        self.db = AsyncDatabase(Database(config.DATABASE_FILE, vote_buffer_size=config.VOTE_BUFFER_SIZE))
         self.news_service = NewsService(self.db, config.NEWS_API_KEY)
+        self.summary_stats = {}  # Estatísticas da última execução do resumo diário
+        self.metrics_runner = None
+        self.loop_monitor = None
 
     async def setup_hook(self):
         from commands import setup
+        # Os tópicos do menu vêm do registro de feeds: carrega antes dos comandos
+        await self.news_service.feed_registry.load(config.FEEDS_FILE)
+        await self.news_service.load_duplicate_index()
         await setup(self)
+        await self.start_metrics()
         self.scheduler.add_job(
             self.send_daily_summary,
             "cron",
             hour=8, minute=0,
             id="daily_summary"
         )
+        self.scheduler.add_job(
+            self.news_service.ingest_all,
+            "interval",
+            minutes=config.INGEST_INTERVAL_MINUTES,
+            next_run_time=datetime.now(),  # Pré-carrega o banco logo ao iniciar
+            id="ingest_feeds",
+            max_instances=1,
+            coalesce=True
+        )
+        self.scheduler.add_job(
+            self.news_service.poll_due_feeds,
+            "interval",
+            seconds=config.FEED_POLL_TICK_SECONDS,
+            next_run_time=datetime.now(),
+            id="poll_feeds",
+            max_instances=1,
+            coalesce=True
+        )
+        self.scheduler.add_job(
+            self.news_service.translation_cache.prune,
+            "cron",
+            hour=4, minute=0,
+            id="prune_translations"
+        )
+        self.scheduler.add_job(
+            self.db.flush_votes,
+            "interval",
+            seconds=config.VOTE_FLUSH_SECONDS,
+            id="flush_votes",
+            max_instances=1,
+            coalesce=True
+        )
         self.scheduler.start()
         logging.info("Tarefa agendada para resumo diário configurada.")
+        logging.info(f"Ingestão de notícias agendada a cada {config.INGEST_INTERVAL_MINUTES} minutos.")
+        logging.info(f"Feeds vencidos verificados a cada {config.FEED_POLL_TICK_SECONDS}s (shard {config.SHARD_ID}/{config.SHARD_COUNT}).")
+
+    async def close(self):
+        if self.is_closed():
+            return
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        if self.loop_monitor is not None:
+            self.loop_monitor.cancel()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        await self.news_service.close()
+        await super().close()
+        await self.db.close()
+
+    async def start_metrics(self):
+        """Inicia a medição de atraso do event loop e o endpoint /metrics, se configurado."""
+        metrics.NEWSAPI_QUOTA_REMAINING.function = self.news_service.newsapi_quota.remaining
+        metrics.TRANSLATION_CACHE_HIT_RATIO.function = lambda: self.news_service.translation_cache.stats()["hit_ratio"]
+        self.loop_monitor = asyncio.create_task(metrics.monitor_event_loop(config.LOOP_LAG_INTERVAL))
+        if not config.METRICS_PORT:
+            return
+        try:
+            self.metrics_runner = await metrics.start_server(config.METRICS_HOST, config.METRICS_PORT)
+        except OSError as e:
+            # Métricas são auxiliares: o bot segue funcionando sem o endpoint
+            logging.error(f"Erro ao iniciar o endpoint de métricas em {config.METRICS_HOST}:{config.METRICS_PORT}: {e}")
 
     async def send_daily_summary(self):
+        """Envia o resumo diário a todos os assinantes (tarefa agendada).
+
+        Os resumos de todos os assinantes vêm de uma única passagem no banco, em
+        streaming. Usuários com o mesmo conjunto de tópicos compartilham um único resumo
+        traduzido. Os envios são feitos por um grupo de workers, limitados por token
+        buckets que respeitam os limites do Discord por rota.
+        """
+        # Todos os processos do cluster agendam o resumo; só quem obtém a lease envia
+        acquired = await self.db.try_acquire_lease(
+            "daily_summary", self.instance_id, config.SUMMARY_LEASE_HOURS * 3600, time.time()
+        )
+        if not acquired:
+            logging.info("Resumo diário já enviado por outro processo; pulando.")
+            return
+        with metrics.SUMMARY_DURATION.time():
+            await self._send_daily_summary()
+
+    async def _send_daily_summary(self):
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT DISTINCT user_id FROM subscriptions")
-                user_ids = [row["user_id"] for row in cursor.fetchall()]
-                if not user_ids:
-                    logging.info("Nenhum usuário com assinaturas para resumo diário.")
-                    return
-
-                for user_id in user_ids:
-                    subscriptions = self.db.get_subscriptions(user_id)
-                    top_news = self.db.get_top_voted_news(subscriptions, limit=3)
+            started_at = time.perf_counter()
+            # Um canal fixo é uma única rota (5 mensagens/5s); DMs usam rotas distintas,
+            # limitadas pelo teto global de requisições do bot
+            channel_bucket = TokenBucket(rate=config.SUMMARY_CHANNEL_RATE, capacity=5)
+            dm_bucket = TokenBucket(rate=config.SUMMARY_DM_RATE, capacity=config.SUMMARY_DM_RATE)
+            queue = asyncio.Queue(maxsize=config.SUMMARY_CONCURRENCY * 2)
+            latencies = []
+            stats = {"users": 0, "sent": 0, "failed": 0}
+
+            async def worker():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    user_id, response = item
+                    send_started_at = time.perf_counter()
+                    try:
+                        sent = await self._send_summary(user_id, response, channel_bucket, dm_bucket)
+                    except Exception as e:
+                        # Um worker que morresse deixaria a fila sem consumidores e o resumo travado
+                        logging.error(f"Erro inesperado ao enviar resumo diário para usuário {user_id}: {e!r}")
+                        sent = False
+                    latencies.append(time.perf_counter() - send_started_at)
+                    stats["sent" if sent else "failed"] += 1
+                    metrics.SUMMARY_MESSAGES.inc(outcome="sent" if sent else "failed")
+
+            workers = [asyncio.create_task(worker()) for _ in range(config.SUMMARY_CONCURRENCY)]
+            summaries = {}
+            try:
+                async for user_id, topics, top_news in self.db.stream("iter_digests", limit=3):
+                    stats["users"] += 1
                     if not top_news:
                         continue
-                    # Traduzir para português por padrão
-                    translated_news = self.news_service.translate_news(top_news, "pt")
-                    response = "\n".join([f"- {news['title']} ({news['url']}) [{news['vote_count']} votos]" for news in translated_news])
-                    user = await self.fetch_user(user_id)
-                    if not user:
-                        continue
-                    try:
-                        if config.SUMMARY_CHANNEL_ID:
-                            channel = self.get_channel(config.SUMMARY_CHANNEL_ID)
-                            if channel:
-                                await channel.send(f"Resumo diário para {user.mention} (pt):\n{response}")
-                            else:
-                                logging.warning(f"Canal {config.SUMMARY_CHANNEL_ID} não encontrado.")
-                                await user.send(f"Resumo diário (pt):\n{response}")
-                        else:
-                            await user.send(f"Resumo diário (pt):\n{response}")
-                        logging.info(f"Resumo diário enviado para usuário {user_id} em pt")
-                    except discord.errors.Forbidden as e:
-                        logging.error(f"Erro ao enviar resumo diário para usuário {user_id}: {e}")
+                    if topics not in summaries:
+                        # Traduzir para português por padrão
+                        translated_news = await self.news_service.translate_news(top_news, "pt")
+                        summaries[topics] = "\n".join([f"- {news.title} ({news.url}) [{news.vote_count} votos]" for news in translated_news])
+                    await queue.put((user_id, summaries[topics]))
+            finally:
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+
+            if not stats["users"]:
+                logging.info("Nenhum usuário com assinaturas para resumo diário.")
+                return
+            elapsed = time.perf_counter() - started_at
+            latencies.sort()
+            self.summary_stats = {
+                **stats,
+                "topic_sets": len(summaries),
+                "duration_s": round(elapsed, 3),
+                "throughput_per_s": round(stats["sent"] / elapsed, 2) if elapsed else 0.0,
+                "latency_p50_s": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+                "latency_p99_s": round(latencies[int(len(latencies) * 0.99)], 3) if latencies else 0.0
+            }
+            logging.info(f"Resumo diário concluído: {self.summary_stats}")
         except Exception as e:
             logging.error(f"Erro ao executar tarefa de resumo diário: {e}")
 
+    async def _send_summary(self, user_id: int, response: str, channel_bucket: TokenBucket, dm_bucket: TokenBucket) -> bool:
+        """Envia o resumo de um usuário, pelo canal configurado ou por DM."""
+        try:
+            # O cache evita uma chamada REST por usuário; fetch_user só se necessário
+            user = self.get_user(user_id) or await self.fetch_user(user_id)
+            channel = self.get_channel(config.SUMMARY_CHANNEL_ID) if config.SUMMARY_CHANNEL_ID else None
+            if config.SUMMARY_CHANNEL_ID and not channel:
+                logging.warning(f"Canal {config.SUMMARY_CHANNEL_ID} não encontrado.")
+            if channel:
+                await channel_bucket.acquire()
+                await channel.send(f"Resumo diário para {user.mention} (pt):\n{response}")
+            else:
+                await dm_bucket.acquire()
+                await user.send(f"Resumo diário (pt):\n{response}")
+            logging.info(f"Resumo diário enviado para usuário {user_id} em pt")
+            return True
+        except discord.errors.HTTPException as e:
+            logging.error(f"Erro ao enviar resumo diário para usuário {user_id}: {e}")
+            return False
+
 bot = NewsBot()
 
 @bot.event
 async def on_ready():
     logging.info(f"Bot conectado como {bot.user}")
     print(f"Bot conectado como {bot.user}")
+    # Os comandos são globais: basta o processo do shard 0 sincronizá-los
+    if bot.shard_ids is not None and 0 not in bot.shard_ids:
+        return
     try:
         synced = await bot.tree.sync()
         logging.info(f"Comandos sincronizados: {synced}")
@@ -88,6 +241,7 @@ async def on_ready():
 @app_commands.command(name="ping", description="Testa a conexão do bot")
 async def ping(interaction: discord.Interaction):
     await interaction.response.send_message("Pong!")
+    metrics.observe_ack(interaction, "ping")
     logging.info(f"Comando /ping executado por {interaction.user}")
 
 bot.tree.add_command(ping)
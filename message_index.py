@@ -0,0 +1,57 @@
+import hashlib
+import math
+from collections import OrderedDict
+
+class BloomFilter:
+    """Filtro de Bloom para inteiros: responde "com certeza ausente" sem consultar o banco."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: int):
+        # Hashing duplo (Kirsch-Mitzenmacher) a partir de um único digest
+        digest = hashlib.blake2b(key.to_bytes(8, "little", signed=True), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: int):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class MessageIndex:
+    """Índice em memória de message_id -> news_ids das mensagens de notícias.
+
+    O filtro de Bloom cobre todas as mensagens conhecidas e descarta reações em
+    mensagens que não são de notícias; o LRU guarda os news_ids das mensagens usadas
+    mais recentemente.
+    """
+
+    def __init__(self, max_entries: int, bloom_capacity: int):
+        self.max_entries = max_entries
+        self._bloom = BloomFilter(bloom_capacity)
+        self._lru = OrderedDict()
+
+    def add(self, message_id: int, news_ids: list):
+        """Registra (ou substitui) os news_ids de uma mensagem."""
+        self._bloom.add(message_id)
+        self._lru[message_id] = list(news_ids)
+        self._lru.move_to_end(message_id)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def might_contain(self, message_id: int) -> bool:
+        """False garante que a mensagem não é de notícias; True pode ser falso positivo."""
+        return message_id in self._bloom
+
+    def get(self, message_id: int):
+        """Retorna os news_ids em cache da mensagem, ou None se não estiverem no LRU."""
+        news_ids = self._lru.get(message_id)
+        if news_ids is not None:
+            self._lru.move_to_end(message_id)
+        return news_ids
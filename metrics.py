@@ -0,0 +1,178 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from aiohttp import web
+
+# Versão do formato de texto de exposição do Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (segundos) dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Metric:
+    """Métrica com rótulos, exposta no formato de texto do Prometheus."""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # tupla de valores dos rótulos -> valor
+        # Os métodos do banco atualizam métricas a partir da thread do banco
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: tuple, value) -> list:
+        return [f"{self.name}{self._labels(key)} {value}"]
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Valor instantâneo. Com `function`, o valor é lido só quando /metrics é consultado."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), function=None):
+        super().__init__(name, help, labelnames)
+        self.function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> list:
+        if self.function is not None:
+            try:
+                self.set(self.function())
+            except Exception as e:
+                logging.error(f"Erro ao calcular a métrica {self.name}: {e!r}")
+        return super().render()
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Contagens por faixa (não acumuladas; a última é +Inf), soma e total
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede a duração do bloco (também quando ele levanta exceção)."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def _render_value(self, key: tuple, value) -> list:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+            lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+        lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+REGISTRY = []
+
+FETCH_DURATION = Histogram("newsbot_fetch_duration_seconds", "Duração das buscas às fontes de notícias", ("source",))
+FETCHES = Counter("newsbot_fetches_total", "Buscas às fontes de notícias por resultado", ("source", "outcome"))
+TRANSLATE_DURATION = Histogram("newsbot_translate_duration_seconds", "Duração de translate_news", ("target_lang",))
+TRANSLATED_TITLES = Counter("newsbot_translated_titles_total", "Títulos traduzidos por origem da tradução", ("origin",))
+DB_DURATION = Histogram(
+    "newsbot_db_call_duration_seconds", "Duração das chamadas a métodos de Database", ("method",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+DB_ERRORS = Counter("newsbot_db_call_errors_total", "Chamadas a métodos de Database que falharam", ("method",))
+INTERACTION_ACK = Histogram(
+    "newsbot_interaction_ack_seconds", "Tempo entre a criação da interação e a primeira resposta do bot", ("callback",)
+)
+EVENT_LOOP_LAG = Histogram(
+    "newsbot_event_loop_lag_seconds", "Atraso do event loop em acordar uma tarefa agendada",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+SUMMARY_DURATION = Histogram(
+    "newsbot_daily_summary_duration_seconds", "Duração de cada execução do resumo diário",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
+SUMMARY_MESSAGES = Counter("newsbot_daily_summary_messages_total", "Mensagens do resumo diário por resultado", ("outcome",))
+LOG_RECORDS_DROPPED = Counter("newsbot_log_records_dropped_total", "Registros de log descartados (amostragem ou fila cheia)", ("reason",))
+# Lidos só na consulta a /metrics; a função é definida por quem conhece o objeto medido
+NEWSAPI_QUOTA_REMAINING = Gauge("newsbot_newsapi_quota_remaining", "Requisições restantes no orçamento da News API")
+TRANSLATION_CACHE_HIT_RATIO = Gauge("newsbot_translation_cache_hit_ratio", "Fração de títulos servidos pelo cache de traduções")
+
+def observe_ack(interaction, callback: str):
+    """Registra o tempo até a primeira resposta (defer ou mensagem) de uma interação."""
+    # created_at vem do snowflake da interação: inclui a entrega pelo gateway
+    elapsed = time.time() - interaction.created_at.timestamp()
+    INTERACTION_ACK.observe(max(0.0, elapsed), callback=callback)
+
+async def monitor_event_loop(interval: float):
+    """Mede continuamente quanto o event loop atrasa para acordar uma tarefa (tarefa de fundo)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started_at = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started_at - interval))
+
+def render() -> str:
+    """Retorna todas as métricas no formato de texto do Prometheus."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+async def start_server(host: str, port: int) -> web.AppRunner:
+    """Serve GET /metrics no event loop atual. As métricas só são formatadas quando consultadas."""
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(body=render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"Métricas disponíveis em http://{host}:{port}/metrics")
+    return runner
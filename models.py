@@ -0,0 +1,26 @@
+from typing import NamedTuple, Optional
+
+class Article(NamedTuple):
+    """Notícia imutável e compacta (uma tupla, sem o dicionário por instância)."""
+
+    title: str
+    url: str
+    topic: str
+    published_at: Optional[str] = None
+    news_id: Optional[int] = None  # Definido para notícias lidas do banco
+    vote_count: int = 0
+    canonical_url: Optional[str] = None  # Preenchidos por dedup.with_fingerprint
+    minhash: Optional[bytes] = None
+
+class TranslatedArticle(NamedTuple):
+    """Título traduzido sobreposto a um Article.
+
+    Guarda só a referência à notícia original e o novo título; os demais campos
+    (url, news_id, vote_count...) são lidos da original, sem cópia.
+    """
+
+    article: Article
+    title: str
+
+    def __getattr__(self, name):
+        return getattr(self.article, name)
@@ -1,33 +1,110 @@
-import requests
-import feedparser
+import asyncio
+import aiohttp
 import logging
-import sqlite3
-from datetime import datetime
-from database import Database
+import random
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+import config
+import metrics
+from database import AsyncDatabase
+from dedup import DuplicateIndex, canonical_url, minhash, with_fingerprint
+from feed_parser import EntrySelector, FeedStreamParser, parse_with_feedparser
+from feeds import FeedRegistry
+from fetch_cache import FetchCache
+from models import Article, TranslatedArticle
+from ratelimit import QuotaManager
+from resilience import CircuitBreaker, LatencyTracker
 from deep_translator import GoogleTranslator
+from translation_cache import TranslationCache
 
-# Configurar logging
-logging.basicConfig(
-    filename="bot.log",
-    level=logging.INFO,
-    format="%(asctime)s:%(levelname)s:%(message)s"
-)
+# Limite de caracteres por chamada ao Google Translate (o backend aceita até 5000)
+TRANSLATION_BATCH_CHARS = 4500
+
+class SourceUnavailable(Exception):
+    """A fonte não respondeu (disjuntor aberto, sem orçamento, 429 ou erro).
+
+    Levantada em vez de uma lista vazia para que a falha não seja guardada no cache de
+    buscas nem conte como atualização do tópico.
+    """
+
+def _answered(results: list, what: str) -> list:
+    """Retorna os resultados das fontes que responderam, vindos de asyncio.gather(return_exceptions=True).
+
+    Erros inesperados são relançados; se nenhuma fonte respondeu, levanta SourceUnavailable.
+    """
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, SourceUnavailable):
+            raise result
+    answered = [result for result in results if not isinstance(result, SourceUnavailable)]
+    if not answered:
+        raise SourceUnavailable(f"nenhuma fonte respondeu ({what})")
+    return answered
 
 class NewsService:
-    def __init__(self, db: Database, news_api_key: str):
+    def __init__(self, db: AsyncDatabase, news_api_key: str):
         self.db = db
         self.news_api_key = news_api_key
-        self.rss_feeds = {
-            "tecnologia": "http://feeds.bbci.co.uk/news/technology/rss.xml",
-            "games": "https://www.engadget.com/rss.xml",
-            "ciberseguranca": "https://www.darkreading.com/rss.xml"
-        }
-        self.translator = GoogleTranslator(source="auto")
-
-    def fetch_news_api(self, topic: str, limit: int = 5) -> list:
-        """Busca notícias da News API por tópico."""
+        self.feed_registry = FeedRegistry(
+            db,
+            shard_id=config.SHARD_ID,
+            shard_count=config.SHARD_COUNT,
+            default_poll_seconds=int(config.FEED_POLL_MINUTES * 60)
+        )
+        self.translators = {}
+        self.translation_cache = TranslationCache(
+            db,
+            max_entries=config.TRANSLATION_CACHE_SIZE,
+            ttl_seconds=config.TRANSLATION_CACHE_TTL_DAYS * 86400,
+            max_rows=config.TRANSLATION_CACHE_MAX_ROWS
+        )
+        self.fetch_cache = FetchCache(
+            ttl_seconds=config.FETCH_CACHE_TTL_SECONDS,
+            stale_seconds=config.FETCH_CACHE_STALE_SECONDS
+        )
+        self.newsapi_quota = QuotaManager(
+            db,
+            "newsapi",
+            limit=config.NEWSAPI_QUOTA,
+            window_seconds=config.NEWSAPI_QUOTA_WINDOW_HOURS * 3600,
+            low_watermark=config.NEWSAPI_QUOTA_LOW
+        )
+        self.duplicate_index = DuplicateIndex(config.DEDUP_INDEX_SIZE, config.DEDUP_THRESHOLD)
+        self._save_lock = asyncio.Lock()  # Consulta e atualização do índice de duplicatas em conjunto
+        self.breakers = {}
+        self.latencies = {}
+        self.timeout = aiohttp.ClientTimeout(total=config.FETCH_TIMEOUT)
+        self._session = None
+        self._fetch_semaphore = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Retorna a sessão HTTP compartilhada, criando-a no loop atual se necessário."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+            self._fetch_semaphore = asyncio.Semaphore(config.FETCH_CONCURRENCY)
+        return self._session
+
+    async def close(self):
+        """Fecha a sessão HTTP compartilhada."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logging.info("Sessão HTTP do NewsService encerrada.")
+
+    async def fetch_news_api(self, topic: str, limit: int = 5) -> list:
+        """Busca notícias da News API por tópico, respeitando o orçamento de requisições.
+
+        Em caso de 429, tenta novamente com backoff exponencial com jitter (ou pelo tempo
+        indicado em Retry-After), desistindo se a espera passar do limite configurado.
+        Levanta SourceUnavailable se a API não responder.
+        """
+        breaker = self._breaker("newsapi")
+        if not breaker.allow():
+            logging.warning(f"Disjuntor da News API aberto, pulando tópico {topic}")
+            metrics.FETCHES.inc(source="newsapi", outcome="breaker_open")
+            raise SourceUnavailable("disjuntor da News API aberto")
+        started_at = time.perf_counter()
         try:
-            url = "https://newsapi.org/v2/everything"
+            url = config.NEWSAPI_URL
             params = {
                 "q": topic,
                 "apiKey": self.news_api_key,
@@ -35,103 +112,482 @@ class NewsService:
                 "sortBy": "publishedAt",
                 "pageSize": limit
             }
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            articles = response.json().get("articles", [])
+            session = self._get_session()
+            for attempt in range(config.NEWSAPI_MAX_RETRIES + 1):
+                if not await self.newsapi_quota.acquire():
+                    logging.warning(f"Orçamento da News API indisponível, pulando tópico {topic}")
+                    metrics.FETCHES.inc(source="newsapi", outcome="quota")
+                    raise SourceUnavailable("orçamento da News API indisponível")
+                async with self._fetch_semaphore:
+                    async with session.get(url, params=params) as response:
+                        await self.newsapi_quota.update_from_headers(response.headers)
+                        if response.status != 429:
+                            response.raise_for_status()
+                            data = await response.json()
+                            break
+                        retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else random.uniform(0, config.NEWSAPI_BACKOFF_BASE * 2 ** attempt)
+                if attempt == config.NEWSAPI_MAX_RETRIES or delay > config.NEWSAPI_MAX_BACKOFF:
+                    # 429 é falta de orçamento, não falha da fonte: não abre o disjuntor
+                    breaker.record_success()
+                    await self.newsapi_quota.block_for(delay)
+                    logging.warning(f"News API limitou as requisições (429) para {topic}; bloqueada por {delay:.1f}s")
+                    metrics.FETCHES.inc(source="newsapi", outcome="rate_limited")
+                    raise SourceUnavailable("News API limitou as requisições (429)")
+                logging.warning(f"News API respondeu 429 para {topic}; nova tentativa em {delay:.1f}s")
+                await asyncio.sleep(delay)
+            breaker.record_success()
+            metrics.FETCH_DURATION.observe(time.perf_counter() - started_at, source="newsapi")
+            metrics.FETCHES.inc(source="newsapi", outcome="ok")
+            articles = data.get("articles", [])
             news_list = [
-                {
-                    "title": article["title"],
-                    "url": article["url"],
-                    "topic": topic,
-                    "published_at": article["publishedAt"]
-                }
+                with_fingerprint(Article(
+                    title=article["title"],
+                    url=article["url"],
+                    topic=topic,
+                    published_at=article["publishedAt"]
+                ))
                 for article in articles
             ]
-            logging.info(f"Buscou {len(news_list)} notícias da News API para tópico {topic}")
+            logging.info(
+                f"Buscou {len(news_list)} notícias da News API para tópico {topic} "
+                f"(orçamento restante: {self.newsapi_quota.remaining()})"
+            )
             return news_list
-        except requests.RequestException as e:
-            logging.error(f"Erro ao buscar notícias da News API para {topic}: {e}")
-            return []
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            breaker.record_failure()
+            logging.error(f"Erro ao buscar notícias da News API para {topic}: {e!r}")
+            metrics.FETCH_DURATION.observe(time.perf_counter() - started_at, source="newsapi")
+            metrics.FETCHES.inc(source="newsapi", outcome="error")
+            raise SourceUnavailable(f"erro na News API: {e!r}") from e
+        finally:
+            # Saídas sem veredito (orçamento esgotado, erro inesperado) liberam a chamada de teste
+            breaker.release()
+
+    async def fetch_rss_feed(self, topic: str, limit: int = 5) -> list:
+        """Busca e grava as notícias novas dos feeds RSS mais prioritários de um tópico.
+
+        Cada feed passa pelo cache e pelo hedge com a sua própria latência. Retorna todas
+        as notícias novas (até `limit` por feed), já gravadas no banco; levanta
+        SourceUnavailable se nenhum feed responder.
+        """
+        feeds = self.feed_registry.feeds_for(topic, config.FEEDS_PER_TOPIC_LIVE)
+        if not feeds:
+            logging.warning(f"Nenhum feed RSS configurado para tópico {topic}")
+            raise SourceUnavailable(f"nenhum feed RSS para {topic}")
+        # A busca de cada feed já grava suas notícias: mesmo abandonada pelo hedge, nada se perde
+        results = await asyncio.gather(
+            *(
+                self._hedged(feed["url"], (feed["url"], "rss", limit), lambda feed=feed: self.ingest_feed(feed, limit))
+                for feed in feeds
+            ),
+            return_exceptions=True
+        )
+        return [news for result in _answered(results, f"feeds RSS de {topic}") for news in result]
+
+    async def ingest_feed(self, feed: dict, limit: int) -> list:
+        """Busca e grava um feed RSS; retorna as notícias novas ou levanta SourceUnavailable.
+
+        É a unidade do hedge na busca ao vivo: a latência registrada para o feed é a desta
+        chamada inteira, e só quando veio uma resposta completa (um 304 termina quase de
+        imediato e puxaria o p95 para baixo).
+        """
+        started_at = time.perf_counter()
+        result = (await self.ingest_feeds([feed], limit))[0]
+        if isinstance(result, SourceUnavailable):
+            raise result
+        news_list, state = result
+        if state is not None:
+            self._latency(feed["url"]).record(time.perf_counter() - started_at)
+        return news_list
+
+    async def ingest_feeds(self, feeds: list, limit: int) -> list:
+        """Busca feeds RSS, grava as notícias novas e só então avança o estado de cada feed.
 
-    def fetch_rss_feed(self, topic: str, limit: int = 5) -> list:
-        """Busca notícias de um feed RSS por tópico."""
+        Se a gravação falhar, o estado não muda e a próxima busca traz as mesmas entradas.
+        Retorna, na ordem de `feeds`, (notícias, estado) de cada feed que respondeu ou a
+        SourceUnavailable de cada um que não respondeu.
+        """
+        results = await asyncio.gather(
+            *(self.fetch_feed(feed["url"], feed["topic"], limit) for feed in feeds),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, SourceUnavailable):
+                raise result
+        answered = [(feed, result) for feed, result in zip(feeds, results) if not isinstance(result, SourceUnavailable)]
+        # Cada feed lista da mais nova para a mais antiga; grava invertido (news_id cresce com a recência)
+        await self.save_news([news for _, (news_list, _) in answered for news in news_list[::-1]])
+        for feed, (_, state) in answered:
+            if state is not None:
+                await self.db.save_feed_state(feed["url"], *state)
+        return results
+
+    async def fetch_feed(self, feed_url: str, topic: str, limit: int = 5) -> tuple:
+        """Busca as notícias novas de um feed RSS.
+
+        Usa requisições condicionais (ETag/Last-Modified): um 304 encerra a busca sem
+        parse. Só retorna entradas mais novas que a última vista no feed. Retorna
+        (notícias, estado), em que estado são os argumentos de Database.save_feed_state
+        (ou None, se não mudou); cabe ao chamador gravá-lo depois de salvar as notícias.
+        Levanta SourceUnavailable se o feed não responder.
+        """
+        breaker = self._breaker(feed_url)
+        if not breaker.allow():
+            logging.warning(f"Disjuntor do feed {feed_url} aberto, pulando")
+            metrics.FETCHES.inc(source="rss", outcome="breaker_open")
+            raise SourceUnavailable(f"disjuntor do feed {feed_url} aberto")
+        started_at = time.perf_counter()
         try:
-            feed_url = self.rss_feeds.get(topic, "")
-            if not feed_url:
-                logging.warning(f"Nenhum feed RSS configurado para tópico {topic}")
-                return []
-            feed = feedparser.parse(feed_url)
+            state = await self.db.get_feed_state(feed_url)
+            headers = {}
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
+            selector = EntrySelector(state, limit)
+            session = self._get_session()
+            async with self._fetch_semaphore:
+                async with session.get(feed_url, headers=headers) as response:
+                    if response.status == 304:
+                        breaker.record_success()
+                        metrics.FETCH_DURATION.observe(time.perf_counter() - started_at, source="rss")
+                        metrics.FETCHES.inc(source="rss", outcome="not_modified")
+                        logging.info(f"Feed RSS {feed_url} não modificado (304)")
+                        return [], None
+                    response.raise_for_status()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if config.FEED_PARSER == "stream":
+                        body = await self._parse_streaming(response, selector, feed_url)
+                    else:
+                        body = await response.read()
+            metrics.FETCH_DURATION.observe(time.perf_counter() - started_at, source="rss")
+            if body is not None:
+                # O parse completo é CPU-bound; roda em uma thread para não bloquear o event loop
+                selector = EntrySelector(state, limit)
+                for entry in await asyncio.to_thread(parse_with_feedparser, body):
+                    if selector.offer(entry):
+                        break
             news_list = [
-                {
-                    "title": entry.title,
-                    "url": entry.link,
-                    "topic": topic,
-                    "published_at": entry.get("published", datetime.now().isoformat())
-                }
-                for entry in feed.entries[:limit]
+                with_fingerprint(Article(
+                    title=entry["title"],
+                    url=entry["link"],
+                    topic=topic,
+                    published_at=entry["published"] or datetime.now().isoformat()
+                ))
+                for entry in selector.entries
+                if entry["link"]
             ]
-            logging.info(f"Buscou {len(news_list)} notícias do RSS para tópico {topic}")
-            return news_list
+            state = None
+            if selector.newest_id is not None:
+                state = (etag, last_modified, selector.newest_id, selector.last_published)
+            breaker.record_success()
+            metrics.FETCHES.inc(source="rss", outcome="ok")
+            logging.info(f"Buscou {len(news_list)} notícias novas do feed {feed_url} ({topic})")
+            return news_list, state
         except Exception as e:
-            logging.error(f"Erro ao buscar notícias do RSS para {topic}: {e}")
-            return []
-
-    def fetch_news(self, topic: str, limit: int = 5) -> list:
-        """Busca notícias combinando News API e RSS, removendo duplicatas."""
-        news_list = []
-        if self.news_api_key:
-            news_list.extend(self.fetch_news_api(topic, limit))
-        if len(news_list) < limit:
-            news_list.extend(self.fetch_rss_feed(topic, limit - len(news_list)))
-        seen_urls = set()
+            breaker.record_failure()
+            logging.error(f"Erro ao buscar notícias do feed {feed_url} ({topic}): {e!r}")
+            metrics.FETCHES.inc(source="rss", outcome="error")
+            raise SourceUnavailable(f"erro no feed {feed_url}: {e!r}") from e
+        finally:
+            breaker.release()
+
+    async def _parse_streaming(self, response: aiohttp.ClientResponse, selector: EntrySelector, feed_url: str):
+        """Faz o parse do feed à medida que o corpo chega, parando quando o seletor estiver satisfeito.
+
+        O restante do documento não é baixado nem processado. Se o feed não for XML bem
+        formado, retorna o corpo inteiro para o parse tolerante do feedparser; caso
+        contrário, retorna None.
+        """
+        parser = FeedStreamParser()
+        received = []  # Guardado só até o fim do parse, para o caso de recorrer ao feedparser
+        try:
+            async for chunk in response.content.iter_chunked(config.FEED_CHUNK_SIZE):
+                received.append(chunk)
+                for entry in parser.feed(chunk):
+                    if selector.offer(entry):
+                        return None
+            for entry in parser.close():
+                if selector.offer(entry):
+                    return None
+            return None
+        except ET.ParseError as e:
+            logging.warning(f"Parse incremental do feed {feed_url} falhou ({e}); usando feedparser")
+            return b"".join(received) + await response.content.read()
+
+    async def fetch_news(self, topic: str, limit: int = 5) -> list:
+        """Busca notícias combinando News API e RSS, removendo duplicatas.
+
+        Levanta SourceUnavailable se nenhuma fonte responder.
+        """
+        # O cache por (tópico ou feed, fonte, limite) faz chamadas simultâneas dividirem uma só busca.
+        # Cada fonte grava o que buscou: mesmo abandonada pelo hedge, nada se perde
+        def fetch_api():
+            return self._hedged("newsapi", (topic, "newsapi", limit), lambda: self.ingest_api(topic, limit))
+
+        if not self.news_api_key:
+            results = await asyncio.gather(self.fetch_rss_feed(topic, limit), return_exceptions=True)
+        elif await self.newsapi_quota.is_low():
+            # Orçamento baixo: o RSS vem primeiro e a News API só completa o que faltar
+            results = await asyncio.gather(self.fetch_rss_feed(topic, limit), return_exceptions=True)
+            fetched = sum(len(result) for result in results if not isinstance(result, BaseException))
+            if fetched < limit and await self.newsapi_quota.can_request():
+                results += await asyncio.gather(fetch_api(), return_exceptions=True)
+        else:
+            # As duas fontes são consultadas em paralelo; o RSS completa o que faltar
+            results = await asyncio.gather(fetch_api(), self.fetch_rss_feed(topic, limit), return_exceptions=True)
+        news_list = [news for result in _answered(results, topic) for news in result]
+        # Remove a mesma notícia vinda das duas fontes (URL canônica ou título quase igual)
+        seen = DuplicateIndex(len(news_list) or 1, config.DEDUP_THRESHOLD)
         unique_news = [
-            news for news in news_list
-            if news["url"] not in seen_urls and not seen_urls.add(news["url"])
+            news for news in map(with_fingerprint, news_list)
+            if seen.add_if_new(news.canonical_url, news.minhash)
         ]
         return unique_news[:limit]
 
-    def translate_news(self, news_list: list, target_lang: str) -> list:
-        """Traduz os títulos das notícias para o idioma alvo."""
+    async def _hedged(self, name: str, key, fetch) -> list:
+        """Busca pelo cache, limitando a espera ao p95 de latência recente dessa busca.
+
+        `name` identifica a latência consultada (a News API ou a URL de um feed), que
+        `fetch()` registra quando recebe uma resposta completa. Se a busca não terminar
+        até o p95, devolve a última cópia boa em cache (ou uma lista vazia, deixando as
+        outras fontes completarem o resultado). A busca continua em segundo plano e
+        atualiza o cache quando terminar.
+        """
+        task = asyncio.ensure_future(self.fetch_cache.get(key, fetch))
+        threshold = self._latency(name).percentile(0.95, min_samples=config.HEDGE_MIN_SAMPLES)
+        if not config.HEDGE_ENABLED or threshold is None:
+            return await task
+        done, _ = await asyncio.wait({task}, timeout=threshold)
+        if done:
+            return task.result()
+        task.add_done_callback(lambda abandoned: abandoned.cancelled() or abandoned.exception())
+        last_good = self.fetch_cache.peek(key)
+        logging.warning(
+            f"Busca de {key[0]} ({key[1]}) não respondeu em {threshold:.2f}s (p95); "
+            f"usando {'cópia em cache' if last_good is not None else 'as outras fontes'}"
+        )
+        return last_good if last_good is not None else []
+
+    def _latency(self, name: str) -> LatencyTracker:
+        """Retorna a medição de latência de uma busca (News API ou URL de feed), criando-a se necessário."""
+        if name not in self.latencies:
+            self.latencies[name] = LatencyTracker()
+        return self.latencies[name]
+
+    def _breaker(self, name: str) -> CircuitBreaker:
+        """Retorna o disjuntor de uma fonte (News API ou URL de feed), criando-o se necessário."""
+        if name not in self.breakers:
+            self.breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=config.BREAKER_RESET_SECONDS
+            )
+        return self.breakers[name]
+
+    async def ingest_topic(self, topic: str) -> int:
+        """Busca as notícias de um tópico (cada fonte as grava no banco) e retorna quantas vieram.
+
+        Se nenhuma fonte responder, o tópico não é marcado como atualizado e a próxima
+        consulta tenta de novo.
+        """
+        try:
+            news_list = await self.fetch_news(topic, limit=config.INGEST_LIMIT)
+        except SourceUnavailable as e:
+            logging.warning(f"Tópico {topic} não atualizado: {e}")
+            return 0
+        await self.db.mark_topic_refreshed(topic)
+        return len(news_list)
+
+    async def ingest_api(self, topic: str, limit: int) -> list:
+        """Busca as notícias de um tópico na News API e as grava; retorna as notícias buscadas.
+
+        É a unidade do hedge da News API: a latência registrada é a desta chamada inteira,
+        só para respostas completas (recusas do disjuntor ou do orçamento levantam
+        SourceUnavailable antes).
+        """
+        started_at = time.perf_counter()
+        news_list = await self.fetch_news_api(topic, limit)
+        # A API lista da mais nova para a mais antiga; grava invertido para que o news_id
+        # cresça com a recência
+        await self.save_news(news_list[::-1])
+        self._latency("newsapi").record(time.perf_counter() - started_at)
+        return news_list
+
+    async def ingest_all(self):
+        """Atualiza o banco com a News API para os tópicos deste shard (tarefa agendada).
+
+        Os feeds RSS são atualizados à parte, por poll_due_feeds, cada um no seu intervalo.
+        """
+        # Pega feeds cadastrados no banco por outros processos
+        await self.feed_registry.refresh()
+        if not self.news_api_key:
+            return
+        # Atualiza o orçamento exibido (gasto também por outros processos e antes de reinícios)
+        await self.newsapi_quota.refresh()
+        topics = [topic for topic in self.feed_registry.topics() if self.feed_registry.owns(topic)]
+        results = await asyncio.gather(
+            *(self.ingest_api_topic(topic) for topic in topics),
+            return_exceptions=True
+        )
+        for topic, result in zip(topics, results):
+            if isinstance(result, Exception):
+                logging.error(f"Erro na ingestão do tópico {topic}: {result!r}")
+        saved = sum(result for result in results if not isinstance(result, Exception))
+        logging.info(
+            f"Ingestão da News API concluída: {saved} notícias buscadas em {len(topics)} tópicos "
+            f"(orçamento da News API: {self.newsapi_quota.remaining()}/{self.newsapi_quota.limit})"
+        )
+
+    async def ingest_api_topic(self, topic: str) -> int:
+        """Busca as notícias de um tópico na News API, grava no banco e retorna quantas vieram."""
+        try:
+            news_list = await self.fetch_cache.get(
+                (topic, "newsapi", config.INGEST_LIMIT),
+                lambda: self.ingest_api(topic, config.INGEST_LIMIT)
+            )
+        except SourceUnavailable:
+            return 0  # Já registrado por fetch_news_api; o tópico fica como estava
+        await self.db.mark_topic_refreshed(topic)
+        return len(news_list)
+
+    async def poll_due_feeds(self):
+        """Busca os feeds RSS deste shard cujo horário de busca chegou (tarefa agendada)."""
+        feeds = await self.feed_registry.claim_due(config.FEED_POLL_BATCH)
+        if not feeds:
+            return
+        results = await self.ingest_feeds(feeds, config.INGEST_LIMIT)
+        answered = [(feed, result) for feed, result in zip(feeds, results) if not isinstance(result, SourceUnavailable)]
+        # Só tópicos com algum feed que respondeu contam como atualizados
+        for topic in dict.fromkeys(feed["topic"] for feed, _ in answered):
+            await self.db.mark_topic_refreshed(topic)
+        logging.info(
+            f"Busca de feeds concluída: {len(answered)} de {len(feeds)} feeds responderam, "
+            f"{sum(len(news_list) for _, (news_list, _) in answered)} notícias novas"
+        )
+
+    async def is_fresh(self, topic: str) -> bool:
+        """Indica se o banco local foi atualizado para o tópico dentro do limite configurado."""
+        refreshed_at = await self.db.get_topic_refreshed_at(topic)
+        if refreshed_at is None:
+            return False
+        max_age = timedelta(minutes=config.NEWS_FRESHNESS_MINUTES)
+        return datetime.now(timezone.utc) - refreshed_at < max_age
+
+    async def get_news(self, topic: str, limit: int = 5) -> list:
+        """Retorna notícias do banco local, forçando uma busca se o tópico estiver desatualizado."""
+        if not await self.is_fresh(topic):
+            logging.info(f"Tópico {topic} desatualizado, buscando notícias das fontes")
+            await self.ingest_topic(topic)
+        return await self.db.get_latest_news(topic, limit)
+
+    async def get_news_for_topics(self, topics: list, limit: int = 5) -> list:
+        """Retorna notícias do banco local para vários tópicos, preservando a ordem dos tópicos."""
+        results = await asyncio.gather(*(self.get_news(topic, limit) for topic in topics))
+        return [news for result in results for news in result]
+
+    async def translate_news(self, news_list: list, target_lang: str) -> list:
+        """Traduz os títulos das notícias para o idioma alvo, usando o cache de traduções."""
+        with metrics.TRANSLATE_DURATION.time(target_lang=target_lang):
+            return await self._translate_news(news_list, target_lang)
+
+    async def _translate_news(self, news_list: list, target_lang: str) -> list:
         try:
-            translated_news = []
-            for news in news_list:
-                translated_title = self.translator.translate(news["title"], target_language=target_lang)
-                translated_news.append({
-                    "title": translated_title or news["title"],  # Fallback para título original
-                    "url": news["url"],
-                    "topic": news["topic"],
-                    "published_at": news["published_at"]
-                })
-            logging.info(f"Traduziu {len(news_list)} notícias para {target_lang}")
+            titles = [news.title for news in news_list]
+            translations = await self.translation_cache.get_many(titles, target_lang)
+            metrics.TRANSLATED_TITLES.inc(sum(title in translations for title in titles), origin="cache")
+            misses = list(dict.fromkeys(title for title in titles if title not in translations))
+            if misses:
+                # O backend é bloqueante (HTTP síncrono); roda fora do event loop
+                translated = await asyncio.to_thread(self._translate_batch, misses, target_lang)
+                await self.translation_cache.put_many(translated, target_lang)
+                translations.update(translated)
+                metrics.TRANSLATED_TITLES.inc(len(translated), origin="backend")
+            # Só o título é sobreposto; os demais campos continuam os da notícia original
+            translated_news = [
+                TranslatedArticle(news, translations.get(news.title) or news.title)  # Fallback para título original
+                for news in news_list
+            ]
+            logging.info(
+                f"Traduziu {len(news_list)} notícias para {target_lang} "
+                f"({len(misses)} fora do cache). Cache: {self.translation_cache.stats()}"
+            )
             return translated_news
         except Exception as e:
             logging.error(f"Erro ao traduzir notícias para {target_lang}: {e}")
             return news_list  # Retorna notícias originais em caso de erro
 
-    def save_news(self, news_list: list) -> list:
-        """Salva notícias no banco de dados e retorna os news_id."""
-        news_ids = []
-        try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                for news in news_list:
-                    cursor.execute(
-                        """
-                        INSERT OR IGNORE INTO news (title, url, topic, published_at)
-                        VALUES (?, ?, ?, ?)
-                        """,
-                        (news["title"], news["url"], news["topic"], news["published_at"])
-                    )
-                    if cursor.rowcount > 0:
-                        cursor.execute(
-                            "SELECT news_id FROM news WHERE url = ?",
-                            (news["url"],)
-                        )
-                        news_id = cursor.fetchone()["news_id"]
-                        news_ids.append(news_id)
-                conn.commit()
-                logging.info(f"Salvas {len(news_list)} notícias no banco, IDs: {news_ids}")
-                return news_ids
-        except sqlite3.Error as e:
-            logging.error(f"Erro ao salvar notícias: {e}")
-            raise
\ No newline at end of file
+    def _get_translator(self, target_lang: str) -> GoogleTranslator:
+        """Retorna (e reutiliza) um tradutor configurado para o idioma alvo."""
+        if target_lang not in self.translators:
+            self.translators[target_lang] = GoogleTranslator(source="auto", target=target_lang)
+        return self.translators[target_lang]
+
+    def _translate_batch(self, titles: list, target_lang: str) -> dict:
+        """Traduz vários títulos com o menor número de chamadas ao backend.
+
+        Os títulos são agrupados em blocos separados por quebra de linha, dentro do limite
+        de caracteres do Google Translate. Se o backend não preservar as linhas de um bloco,
+        esse bloco é traduzido título a título.
+        """
+        translator = self._get_translator(target_lang)
+        normalized = [TranslationCache.normalize(title) for title in titles]
+        translations = {}
+        chunk = []
+        chunks = []
+        for index, title in enumerate(normalized):
+            if chunk and sum(len(normalized[i]) + 1 for i in chunk) + len(title) > TRANSLATION_BATCH_CHARS:
+                chunks.append(chunk)
+                chunk = []
+            chunk.append(index)
+        if chunk:
+            chunks.append(chunk)
+        for chunk in chunks:
+            result = translator.translate("\n".join(normalized[i] for i in chunk)) or ""
+            lines = result.split("\n")
+            if len(lines) != len(chunk):
+                lines = translator.translate_batch([normalized[i] for i in chunk])
+            for i, line in zip(chunk, lines):
+                if line:
+                    translations[titles[i]] = line.strip()
+        return translations
+
+    async def save_news(self, news_list: list) -> list:
+        """Salva no banco as notícias que não duplicam outras já vistas e retorna seus news_id.
+
+        Notícias com a mesma URL canônica ou título quase igual ao de uma notícia do
+        índice de duplicatas (ou de outra notícia do mesmo lote) são descartadas. O índice
+        só é atualizado depois que a gravação termina: se ela falhar, uma nova tentativa
+        não descarta as mesmas notícias como duplicatas.
+        """
+        async with self._save_lock:
+            batch = DuplicateIndex(max(len(news_list), 1), self.duplicate_index.threshold)
+            fresh = [
+                news for news in map(with_fingerprint, news_list)
+                if self.duplicate_index.find(news.canonical_url, news.minhash) is None
+                and batch.add_if_new(news.canonical_url, news.minhash)
+            ]
+            if len(fresh) < len(news_list):
+                logging.info(f"Descartadas {len(news_list) - len(fresh)} notícias duplicadas de {len(news_list)}")
+            news_ids = await self.db.save_news(fresh)
+            for news in fresh:
+                self.duplicate_index.add(news.canonical_url, news.minhash)
+            return news_ids
+
+    async def load_duplicate_index(self):
+        """Carrega no índice de duplicatas as notícias mais recentes do banco.
+
+        Notícias gravadas antes das assinaturas existirem têm a assinatura calculada e
+        gravada agora.
+        """
+        backfill = []
+        async for news_id, title, url, canonical, signature in self.db.stream("iter_fingerprints", config.DEDUP_INDEX_SIZE):
+            if canonical is None:
+                canonical, signature = canonical_url(url), minhash(title)
+                backfill.append((canonical, signature, news_id))
+            self.duplicate_index.add(canonical, signature)
+        if backfill:
+            await self.db.save_fingerprints(backfill)
+        logging.info(f"Índice de duplicatas carregado com {len(self.duplicate_index)} notícias.")
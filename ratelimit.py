@@ -0,0 +1,91 @@
+import asyncio
+import time
+from database import AsyncDatabase
+
+class TokenBucket:
+    """Limitador assíncrono: libera até `rate` operações por segundo, com rajadas de até `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """Aguarda até haver um token disponível e o consome."""
+        # O lock garante ordem de chegada entre as tarefas que aguardam
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+class QuotaManager:
+    """Orçamento de requisições de uma API em uma janela móvel, compartilhado pelo banco.
+
+    As requisições feitas ficam registradas no banco, de modo que o orçamento sobrevive
+    a reinícios e é dividido por todos os processos que usam a mesma chave. Também
+    respeita cabeçalhos de limite enviados pela API (restante e Retry-After) e indica
+    quando o orçamento está baixo, para que o chamador prefira outras fontes.
+    """
+
+    def __init__(self, db: AsyncDatabase, api: str, limit: int, window_seconds: float, low_watermark: int):
+        self.db = db
+        self.api = api
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.low_watermark = low_watermark
+        self._remaining = limit  # Último valor lido do banco
+        self._blocked_until = 0.0
+
+    def remaining(self) -> int:
+        """Requisições disponíveis na última leitura do orçamento (sem acessar o banco)."""
+        return self._remaining
+
+    async def refresh(self) -> int:
+        """Relê o orçamento no banco e retorna as requisições disponíveis na janela atual."""
+        self._remaining, self._blocked_until = await self.db.get_api_quota(
+            self.api, self.limit, self.window_seconds, time.time()
+        )
+        return self._remaining
+
+    async def can_request(self) -> bool:
+        """Indica se uma requisição pode ser feita agora."""
+        remaining = await self.refresh()
+        return time.time() >= self._blocked_until and remaining > 0
+
+    async def is_low(self) -> bool:
+        """Indica se o orçamento restante chegou ao limite de economia."""
+        return await self.refresh() <= self.low_watermark
+
+    async def acquire(self) -> bool:
+        """Reserva uma requisição no orçamento; retorna False se não houver orçamento disponível."""
+        remaining = await self.db.reserve_api_request(self.api, self.limit, self.window_seconds, time.time())
+        if remaining is None:
+            await self.refresh()
+            return False
+        self._remaining = remaining
+        return True
+
+    async def block_for(self, seconds: float):
+        """Impede novas requisições (de todos os processos) pelos próximos `seconds` segundos."""
+        await self.db.save_api_quota(self.api, blocked_until=time.time() + seconds)
+
+    async def update_from_headers(self, headers):
+        """Lê os cabeçalhos de limite (X-RateLimit-Remaining/RateLimit-Remaining e Retry-After)."""
+        for name in ("X-RateLimit-Remaining", "RateLimit-Remaining"):
+            value = headers.get(name)
+            if value is not None and value.isdigit():
+                await self.db.save_api_quota(self.api, reported_remaining=int(value), reported_at=time.time())
+                self._remaining = min(self._remaining, int(value))
+                break
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None and retry_after.isdigit():
+            await self.block_for(int(retry_after))
@@ -0,0 +1,77 @@
+import logging
+import time
+from collections import deque
+
+class CircuitBreaker:
+    """Disjuntor por fonte: para de chamar uma fonte depois de falhas seguidas.
+
+    Fechado, tudo passa. Após `failure_threshold` falhas seguidas ele abre e recusa
+    chamadas por `reset_seconds`; depois disso fica meio aberto e libera uma única
+    chamada de teste, que fecha o disjuntor se der certo ou o reabre se falhar.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Indica se uma chamada à fonte pode ser feita agora."""
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logging.info(f"Disjuntor de {self.name} fechado.")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release(self):
+        """Libera a chamada de teste que terminou sem dizer se a fonte se recuperou.
+
+        Ex.: a busca desistiu por falta de orçamento ou falhou por um erro que não é da
+        fonte. Sem isso, o disjuntor meio aberto recusaria chamadas para sempre. Depois
+        de record_success ou record_failure, não tem efeito.
+        """
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logging.warning(f"Disjuntor de {self.name} aberto após {self.failures} falhas.")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+class LatencyTracker:
+    """Guarda as latências recentes de uma fonte para estimar percentis."""
+
+    def __init__(self, max_samples: int = 200):
+        self._samples = deque(maxlen=max_samples)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float, min_samples: int = 1):
+        """Retorna o percentil das latências recentes, ou None se houver poucas amostras."""
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from database import AsyncDatabase
+
+class TranslationCache:
+    """Cache de traduções em dois níveis: LRU em memória na frente da tabela `translations`."""
+
+    def __init__(self, db: AsyncDatabase, max_entries: int, ttl_seconds: float, max_rows: int):
+        self.db = db
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self._lru = OrderedDict()  # (title_hash, target_lang) -> (translated, created_at)
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(title: str) -> str:
+        """Normaliza espaços do título para que variações triviais compartilhem a entrada."""
+        return " ".join(title.split())
+
+    @classmethod
+    def key(cls, title: str) -> str:
+        """Retorna o hash do título normalizado usado como chave do cache."""
+        return hashlib.sha1(cls.normalize(title).encode("utf-8")).hexdigest()
+
+    async def get_many(self, titles: list, target_lang: str) -> dict:
+        """Retorna {título: tradução} para os títulos presentes no cache e dentro do TTL."""
+        found = {}
+        pending = {}
+        cutoff = time.time() - self.ttl_seconds
+        for title in titles:
+            title_hash = self.key(title)
+            entry = self._lru.get((title_hash, target_lang))
+            if entry and entry[1] >= cutoff:
+                self._lru.move_to_end((title_hash, target_lang))
+                found[title] = entry[0]
+                self.hits += 1
+            else:
+                pending.setdefault(title_hash, []).append(title)
+        if pending:
+            rows = await self.db.get_translations(list(pending), target_lang, cutoff)
+            for title_hash, (translated, created_at) in rows.items():
+                self._remember(title_hash, target_lang, translated, created_at)
+                for title in pending.pop(title_hash):
+                    found[title] = translated
+                    self.db_hits += 1
+            self.misses += sum(len(titles) for titles in pending.values())
+        return found
+
+    async def put_many(self, translations: dict, target_lang: str):
+        """Grava {título: tradução} na memória e no banco."""
+        now = time.time()
+        rows = []
+        for title, translated in translations.items():
+            title_hash = self.key(title)
+            self._remember(title_hash, target_lang, translated, now)
+            rows.append((title_hash, target_lang, translated, now))
+        if rows:
+            await self.db.save_translations(rows)
+
+    async def prune(self):
+        """Remove do banco as traduções expiradas e as mais antigas além do limite de linhas."""
+        removed = await self.db.prune_translations(time.time() - self.ttl_seconds, self.max_rows)
+        logging.info(f"Cache de traduções podado: {removed} entradas removidas. {self.stats()}")
+
+    def stats(self) -> dict:
+        """Retorna os contadores de acerto/erro do cache."""
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.db_hits) / lookups if lookups else 0.0,
+            "entries": len(self._lru)
+        }
+
+    def _remember(self, title_hash: str, target_lang: str, translated: str, created_at: float):
+        self._lru[(title_hash, target_lang)] = (translated, created_at)
+        self._lru.move_to_end((title_hash, target_lang))
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)